@@ -1,3 +1,4 @@
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -7,11 +8,21 @@ from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.core.cache import TTLCache
 from app.database import get_db
 from app.models.user import User
 
 security = HTTPBearer()
 
+# 已认证用户缓存：token -> (user_id, exp)，省去每次请求的签名校验；
+# user_id -> (name, phone, status)，省去每次请求的 users 查询。
+# 用户信息变更时须调用 invalidate_user_cache；多 worker 部署下其他进程最迟 TTL 后生效
+AUTH_CACHE_TTL = 60.0
+AUTH_CACHE_SIZE = 4096
+
+_token_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+_user_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+
 
 def create_access_token(user_id: int) -> str:
     expire = datetime.utcnow() + timedelta(hours=1)
@@ -19,31 +30,64 @@ def create_access_token(user_id: int) -> str:
     return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
 
+def invalidate_user_cache(user_id: int) -> None:
+    """用户的状态、姓名、手机号、密码变更后调用"""
+    _user_cache.delete(user_id)
+
+
+def get_auth_cache_stats() -> dict:
+    return {"token": _token_cache.stats(), "user": _user_cache.stats()}
+
+
+def _decode_user_id(token: str) -> Optional[int]:
+    cached = _token_cache.get(token)
+    if cached is not None:
+        user_id, exp = cached
+        if exp > time.time():
+            return user_id
+        _token_cache.delete(token)
+        return None
+    try:
+        payload = jwt.decode(
+            token, settings.jwt_secret, algorithms=[settings.jwt_algorithm]
+        )
+        user_id = int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        # 缓存时间不超过 token 剩余有效期
+        _token_cache.set(token, (user_id, exp), ttl=exp - time.time())
+    return user_id
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
 ) -> User:
+    """返回当前用户的快照（未绑定 session），需要修改用户时请按 id 重新查询"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="无效的认证信息",
     )
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(
-            token, settings.jwt_secret, algorithms=[settings.jwt_algorithm]
-        )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+    user_id = _decode_user_id(credentials.credentials)
+    if user_id is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if user is None:
-        raise credentials_exception
-    if user.status != "已注册":
+    cached = _user_cache.get(user_id)
+    if cached is None:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            raise credentials_exception
+        cached = (user.name, user.phone, user.status)
+        _user_cache.set(user_id, cached)
+        # 已取出快照，结束只读事务以归还连接：async 路由的后续查询在其他线程或异步引擎上执行，
+        # 不应在等待期间占用连接池
+        db.rollback()
+    name, phone, user_status = cached
+    if user_status != "已注册":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="账号状态异常，无法访问",
         )
-    return user
+    return User(id=user_id, name=name, phone=phone, status=user_status)
@@ -0,0 +1,314 @@
+"""进程内指标与 Prometheus 文本格式输出
+
+不依赖 prometheus_client：计数器、直方图、回调式仪表盘各自加锁累加，/metrics 请求时统一渲染。
+指标按进程统计，多 worker 部署时由 Prometheus 分别抓取各 worker 后聚合。
+包括：
+- MetricsMiddleware：按路由模板统计请求数、耗时，以及每个请求内执行的 SQL 条数与耗时；
+- instrument_engine：SQLAlchemy 引擎的 SQL 耗时（cursor 事件）与连接池状态；
+- TimedQueuePool：记录从连接池获取连接的等待时间（非 SQLite 引擎）。
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Iterable, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+_registry: list = []
+_registry_lock = threading.Lock()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def samples(self) -> Iterable[tuple[str, tuple, tuple, float]]:
+        """(指标名, 标签名, 标签值, 数值)"""
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for name, label_names, label_values, value in self.samples():
+            lines.append(f"{name}{_format_labels(label_names, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for label_values, value in items:
+            yield self.name, self.labels, label_values, value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values: dict[tuple, list] = {}  # 标签值 -> [各桶计数（非累计）..., +Inf 桶, 总和]
+
+    def observe(self, value: float, *label_values) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def samples(self):
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        names = self.labels + ("le",)
+        for label_values, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket", names, label_values + (_format_value(float(bound)),), cumulative
+            yield f"{self.name}_sum", self.labels, label_values, state[-1]
+            yield f"{self.name}_count", self.labels, label_values, cumulative
+
+
+class Gauge(_Metric):
+    """set/inc/dec 直接设置，或传入 collect 回调在渲染时读取（返回 {标签值元组: 数值}）"""
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        collect: Callable[[], dict] | None = None,
+    ):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple, float] = {}
+        self._collectors: list[Callable[[], dict]] = [collect] if collect else []
+
+    def add_collector(self, collect: Callable[[], dict]) -> None:
+        self._collectors.append(collect)
+
+    def set(self, value: float, *label_values) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for collect in self._collectors:
+            values.update(collect())
+        for label_values, value in values.items():
+            yield self.name, self.labels, label_values, value
+
+
+class CounterCollector(Gauge):
+    """渲染时由回调读取的累计值（如缓存命中次数），以 counter 类型输出"""
+
+    type = "counter"
+
+
+def render_metrics() -> str:
+    with _registry_lock:
+        metrics = list(_registry)
+    lines: list[str] = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---- HTTP ----
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP 请求数", ("method", "route", "status"))
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP 请求耗时（至响应发送完毕）", ("method", "route")
+)
+HTTP_IN_PROGRESS = Gauge("http_requests_in_progress", "处理中的 HTTP 请求数")
+HTTP_DB_QUERIES = Histogram(
+    "http_request_db_queries", "单个请求执行的 SQL 条数", ("route",), buckets=COUNT_BUCKETS
+)
+HTTP_DB_SECONDS = Histogram(
+    "http_request_db_duration_seconds", "单个请求内 SQL 执行耗时合计", ("route",), buckets=DB_BUCKETS
+)
+
+# ---- 数据库 ----
+
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "单条 SQL 执行耗时", ("engine",), buckets=DB_BUCKETS
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "从连接池获取连接的等待时间", ("engine",), buckets=DB_BUCKETS
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "连接池常驻连接数上限", ("engine",))
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "已借出的连接数", ("engine",))
+DB_POOL_CHECKED_IN = Gauge("db_pool_checked_in", "池中空闲连接数", ("engine",))
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "超出 pool_size 的连接数（为负表示尚未建满）", ("engine",))
+
+# 当前请求内的 [SQL 条数, 耗时合计]；线程池任务会复制上下文，共享同一个列表
+_request_db: ContextVar[list | None] = ContextVar("request_db", default=None)
+
+
+class TimedQueuePool(QueuePool):
+    """记录获取连接的等待时间（池满时 checkout 会阻塞至 pool_timeout）"""
+
+    metrics_label = "main"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start, self.metrics_label)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(label: str):
+    def handler(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        DB_QUERY_LATENCY.observe(elapsed, label)
+        stats = _request_db.get()
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += elapsed
+
+    return handler
+
+
+def instrument_engine(engine, label: str = "main") -> None:
+    """为同步引擎（异步引擎传 async_engine.sync_engine）注册 SQL 计时事件与连接池仪表盘"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute(label))
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+    if isinstance(pool, TimedQueuePool):
+        pool.metrics_label = label
+    DB_POOL_SIZE.add_collector(lambda: {(label,): pool.size()})
+    DB_POOL_CHECKED_OUT.add_collector(lambda: {(label,): pool.checkedout()})
+    DB_POOL_CHECKED_IN.add_collector(lambda: {(label,): pool.checkedin()})
+    DB_POOL_OVERFLOW.add_collector(lambda: {(label,): pool.overflow()})
+
+
+# 路由对象 -> 所属 include_router 的前缀（路由对象常驻，按 id 缓存）
+_route_prefixes: dict[int, str] = {}
+
+
+def _route_label(scope) -> str:
+    """完整路由模板（如 /api/inventory/overview、/api/user/admin/{id}、/uploads），
+    未匹配的路径统一归为 unmatched，避免标签基数膨胀"""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "unmatched"
+    prefix = _route_prefixes.get(id(route))
+    if prefix is None:
+        # 旧版 FastAPI 的 include_router 会复制路由并把前缀并入 path，此时整条路径即可匹配、前缀为空；
+        # 较新版本不再复制，scope["route"] 为子路由中的原始路由，
+        # path 不含前缀（如 /low-stock）。统一按路径找出能被该路由完整匹配的最长后缀，之前的部分即为前缀
+        path = scope["path"]
+        regex = getattr(route, "path_regex", None)
+        prefix = ""
+        if regex is not None:
+            for i in range(len(path)):
+                if path[i] == "/" and regex.fullmatch(path[i:]):
+                    prefix = path[:i]
+                    break
+        _route_prefixes[id(route)] = prefix
+    return prefix + template
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        start = time.perf_counter()
+        stats = [0, 0.0]
+        token = _request_db.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_PROGRESS.dec()
+            _request_db.reset(token)
+            route = _route_label(scope)
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method, route, str(status))
+            HTTP_LATENCY.observe(time.perf_counter() - start, method, route)
+            HTTP_DB_QUERIES.observe(stats[0], route)
+            HTTP_DB_SECONDS.observe(stats[1], route)
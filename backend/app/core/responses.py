@@ -0,0 +1,51 @@
+"""预序列化 JSON 响应与 ETag 条件请求
+
+路由直接返回 dict 时，FastAPI 会先用 jsonable_encoder 逐层复制一遍再序列化。
+列表接口的数据已全部是 str/int/bool 等基础类型，用 orjson 直接编码为 bytes 即可。
+"""
+import hashlib
+from typing import Any
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+
+# 客户端可缓存响应，但每次使用前须带 If-None-Match 重新验证
+ETAG_CACHE_CONTROL = "no-cache"
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+def make_etag(*parts) -> str:
+    return '"' + "-".join(str(p) for p in parts) + '"'
+
+
+def content_etag(prefix: str, content: Any) -> str:
+    """按内容哈希生成 ETag：数据被绕过版本号修改（直接改表、脚本）时 ETag 也会变化"""
+    digest = hashlib.sha1(orjson.dumps(content, option=orjson.OPT_SORT_KEYS)).hexdigest()[:16]
+    return make_etag(prefix, digest)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 是否命中 etag（弱比较，支持多个值与 *）"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL})
+
+
+def etag_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL}
@@ -0,0 +1,94 @@
+"""/uploads 静态文件服务
+
+上传文件名为随机 uuid，内容写入后不再改变，因此：
+- Cache-Control 为一年 + immutable，客户端与代理在有效期内不再回源验证；
+- ETag 由文件名、大小、修改时间构成（强 ETag，无需读取文件计算摘要）；
+- 支持 Range（Starlette FileResponse），服务器支持 ASGI pathsend 扩展时由服务器直接 sendfile，
+  否则以较大分块读取；
+- 若存在预压缩文件（<文件>.br / <文件>.gz）且客户端接受对应编码，直接发送压缩版本；
+- 以 . 开头的文件（上传、生成缩略图过程中的临时文件）不对外提供。
+"""
+import os
+import stat
+from mimetypes import guess_type
+from pathlib import PurePosixPath
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+UPLOAD_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# (Content-Encoding, 文件后缀)，按优先级排列
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+class _UploadFileResponse(FileResponse):
+    chunk_size = 256 * 1024
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted = set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        q = params.strip().removeprefix("q=")
+        if name and not (params and q.replace(".", "", 1).isdigit() and float(q) == 0):
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class UploadFiles(StaticFiles):
+    def _lookup(self, path: str, accept_encoding: str):
+        """在线程中执行：定位文件与可用的预压缩版本。
+        返回 (文件路径, stat, 编码或 None, 是否存在预压缩版本)，找不到返回 None"""
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            return None
+        accepted = _accepted_encodings(accept_encoding) if accept_encoding else set()
+        chosen = (full_path, stat_result, None)
+        has_variants = False
+        for encoding, suffix in PRECOMPRESSED:
+            try:
+                variant_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            has_variants = True
+            if chosen[2] is None and encoding in accepted:
+                chosen = (full_path + suffix, variant_stat, encoding)
+        return (*chosen, has_variants)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405, headers={"Allow": "GET, HEAD"})
+        if any(part.startswith(".") for part in PurePosixPath(path).parts):
+            raise HTTPException(status_code=404)
+        request_headers = Headers(scope=scope)
+        try:
+            found = await anyio.to_thread.run_sync(
+                self._lookup, path, request_headers.get("accept-encoding", "")
+            )
+        except (OSError, ValueError):
+            found = None
+        if found is None:
+            raise HTTPException(status_code=404)
+        file_path, stat_result, encoding, has_variants = found
+        name = os.path.basename(path)
+        etag = f'"{name}-{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}'
+        headers = {"cache-control": UPLOAD_CACHE_CONTROL}
+        if encoding:
+            headers["content-encoding"] = encoding
+            etag += f"-{encoding}"
+        if has_variants:
+            headers["vary"] = "Accept-Encoding"
+        headers["etag"] = etag + '"'
+        response = _UploadFileResponse(
+            file_path,
+            stat_result=stat_result,
+            headers=headers,
+            media_type=guess_type(name)[0] or "application/octet-stream",
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -1,23 +1,52 @@
-from sqlalchemy import create_engine
+from sqlalchemy import DateTime, create_engine
+from sqlalchemy.dialects import mysql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
+from app.core.metrics import TimedQueuePool
 
 _connect_args = {}
+_engine_options = {}
 if settings.database_url.startswith("sqlite"):
     _connect_args = {"check_same_thread": False}
+else:
+    # 记录连接池等待时间（/metrics）。SQLite 沿用方言默认的连接池：
+    # sqlite:///:memory: 依赖 SingletonThreadPool/StaticPool，换成 QueuePool 后每个连接都是空库
+    _engine_options["poolclass"] = TimedQueuePool
 
 engine = create_engine(
     settings.database_url,
     connect_args=_connect_args,
     pool_pre_ping=not settings.database_url.startswith("sqlite"),
     echo=False,
+    **_engine_options,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# create_time 由数据库 CURRENT_TIMESTAMP 写入（秒精度），SQLite 中存为 'YYYY-MM-DD HH:MM:SS'。
+# SQLite 按字符串比较日期时间，默认的 DateTime 绑定值带 '.000000' 后缀，
+# 游标条件 create_time < :v 会把游标行自身判为更早而重复返回；统一为秒精度格式（与 MySQL DATETIME 一致）
+CreateTime = DateTime().with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite")
+
+# 可选的异步引擎：未配置 async_database_url 时为 None，只读接口回退到线程池中的同步会话
+async_engine = None
+AsyncSessionLocal = None
+if settings.async_database_url:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        settings.async_database_url,
+        pool_pre_ping=not settings.async_database_url.startswith("sqlite"),
+        echo=False,
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
 
 def get_db():
     db = SessionLocal()
@@ -25,3 +54,48 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """异步会话；未启用异步引擎时为 None"""
+    if AsyncSessionLocal is None:
+        yield None
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def upsert(db, model, values: dict, updates: dict) -> None:
+    """按主键插入一行，已存在时改为执行 updates（列名 -> 表达式，表达式中的列取已有行的值）。
+    单条语句完成（MySQL ON DUPLICATE KEY UPDATE / SQLite ON CONFLICT DO UPDATE）：
+    并发事务首次写入同一主键时不会因先 UPDATE 都未命中而重复 INSERT（主键冲突或死锁）"""
+    if db.get_bind().dialect.name == "mysql":
+        stmt = mysql.insert(model).values(**values).on_duplicate_key_update(**updates)
+    else:
+        stmt = sqlite.insert(model).values(**values).on_conflict_do_update(
+            index_elements=[c.name for c in model.__table__.primary_key.columns],
+            set_=updates,
+        )
+    db.execute(stmt)
+
+
+def _run_sync_read(db, sync_fn, *args, **kwargs):
+    try:
+        return sync_fn(db, *args, **kwargs)
+    finally:
+        # 立即归还连接：否则请求在等待下一个线程池任务时仍占用连接，
+        # 并发超过连接池大小时线程池与连接池互相等待
+        db.close()
+
+
+async def run_read(async_db, db, async_fn, sync_fn, *args, **kwargs):
+    """只读查询：有异步会话时 await async_fn(async_db, ...)，否则在线程池中执行 sync_fn(db, ...)，
+    执行完即归还连接（会话之后仍可继续使用）"""
+    if async_db is not None:
+        return await async_fn(async_db, *args, **kwargs)
+    return await run_in_threadpool(_run_sync_read, db, sync_fn, *args, **kwargs)
+
+
+async def dispose_async_engine() -> None:
+    if async_engine is not None:
+        await async_engine.dispose()
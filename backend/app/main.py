@@ -1,21 +1,47 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
 from app.config import settings
-from app.routers import auth, inbound, outbound, inventory, user, config, upload, wechat
+from app.core.metrics import MetricsMiddleware, instrument_engine
+from app.core.static_files import UploadFiles
+from app.database import async_engine, dispose_async_engine, engine
+from app.routers import auth, inbound, outbound, inventory, user, config, upload, wechat, metrics
+from app.services.audit_service import audit_writer
+from app.services.image_service import shutdown_image_pool
+from app.services.wechat_service import aclose_clients
 
 # Create uploads directory
 Path(settings.upload_dir).mkdir(parents=True, exist_ok=True)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    audit_writer.start()
+    yield
+    # 关闭前写完队列中的登录/注册历史
+    audit_writer.stop()
+    shutdown_image_pool()
+    await aclose_clients()
+    await dispose_async_engine()
+
+
 app = FastAPI(
     title="仓库管理 API",
     version="1.0.0",
     description="仓库管理后端接口，包含认证、入库、出库、库存查询、用户信息、配置、图片上传等。业务接口需携带 `Authorization: Bearer <token>`。",
+    lifespan=lifespan,
 )
 
-# Mount static files for uploaded images
-app.mount("/uploads", StaticFiles(directory=settings.upload_dir), name="uploads")
+# 请求数、耗时与每请求 SQL 统计，见 /metrics
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine, "async")
+
+# Mount static files for uploaded images（长期缓存、Range、预压缩版本，见 app/core/static_files.py）
+app.mount("/uploads", UploadFiles(directory=settings.upload_dir), name="uploads")
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
@@ -26,6 +52,7 @@ app.include_router(user.router, prefix="/api/user", tags=["user"])
 app.include_router(config.router, prefix="/api", tags=["config"])
 app.include_router(upload.router, prefix="/api", tags=["upload"])
 app.include_router(wechat.router, prefix="/api/wechat", tags=["wechat"])
+app.include_router(metrics.router)
 
 
 @app.get("/health")
@@ -5,5 +5,8 @@ from app.models.login_history import LoginHistory
 from app.models.register_history import RegisterHistory
 from app.models.inbound_history import InboundHistory
 from app.models.outbound_history import OutboundHistory
+from app.models.stock_summary import StockSummary
+from app.models.daily_io_rollup import DailyIoRollup
+from app.models.data_version import DataVersion
 
-__all__ = ["User", "InventoryRecord", "Config", "LoginHistory", "RegisterHistory", "InboundHistory", "OutboundHistory"]
+__all__ = ["User", "InventoryRecord", "Config", "LoginHistory", "RegisterHistory", "InboundHistory", "OutboundHistory", "StockSummary", "DailyIoRollup", "DataVersion"]
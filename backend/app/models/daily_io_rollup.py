@@ -0,0 +1,13 @@
+"""每日出入库汇总：按 (day, item_type) 累计入库、出库数量，随入库/出库在同一事务内增量更新"""
+from sqlalchemy import Column, String, Integer, Date
+
+from app.database import Base
+
+
+class DailyIoRollup(Base):
+    __tablename__ = "daily_io_rollup"
+
+    day = Column(Date, primary_key=True)
+    item_type = Column(String(64), primary_key=True)
+    inbound_qty = Column(Integer, nullable=False, default=0)
+    outbound_qty = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,11 @@
+"""数据版本号：inventory、config 各一行，数据变更提交后递增，用于生成 ETag"""
+from sqlalchemy import BigInteger, Column, String
+
+from app.database import Base
+
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    name = Column(String(32), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
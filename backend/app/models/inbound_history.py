@@ -1,15 +1,23 @@
-from sqlalchemy import Column, BigInteger, String, Integer, Date, DateTime
+from sqlalchemy import Column, BigInteger, String, Integer, Date, Index
 from sqlalchemy.sql import func
 
-from app.database import Base
+from app.database import Base, CreateTime
 
 
 class InboundHistory(Base):
     """入库历史：记录每次成功入库的明细，关联用户"""
     __tablename__ = "inbound_history"
+    __table_args__ = (
+        # 我的入库按 (create_time, id) 游标分页
+        Index("ix_inbound_history_user_create_id", "user_id", "create_time", "id"),
+        # 出入库统计：按日期范围聚合各物品数量（覆盖索引）
+        Index("ix_inbound_history_date_item_qty", "inbound_date", "item_type", "quantity"),
+        # 出入库明细：按物品 + 日期范围
+        Index("ix_inbound_history_item_date", "item_type", "inbound_date"),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
-    user_id = Column(BigInteger, nullable=False, index=True)
+    user_id = Column(BigInteger, nullable=False)
     inventory_record_id = Column(String(36), nullable=False, index=True)  # 关联 inventory_records
     item_type = Column(String(64), nullable=False)
     unit = Column(String(32), nullable=True, default="")
@@ -20,4 +28,4 @@ class InboundHistory(Base):
     tag = Column(String(16), nullable=True, default="")
     location = Column(String(64), nullable=True, default="")
     photo = Column(String(512), nullable=True, default="")
-    create_time = Column(DateTime, server_default=func.now())
+    create_time = Column(CreateTime, server_default=func.now())
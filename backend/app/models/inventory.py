@@ -1,21 +1,33 @@
-from sqlalchemy import Column, String, Integer, Date, DateTime, Text
+from sqlalchemy import Column, String, Integer, Date, Index
 from sqlalchemy.sql import func
 
-from app.database import Base
+from app.database import Base, CreateTime
 
 
 class InventoryRecord(Base):
     __tablename__ = "inventory_records"
+    __table_args__ = (
+        # 总览按物品类型筛选后按到期日排序
+        Index("ix_inventory_records_item_type_expiry", "item_type", "expiry_date"),
+        # FIFO 出库：按物品类型筛选后按入库顺序读取
+        Index("ix_inventory_records_item_type_fifo", "item_type", "inbound_date", "create_time"),
+        # 出库列表：全部批次按入库顺序
+        Index("ix_inventory_records_inbound_create", "inbound_date", "create_time"),
+        # 到期告警：按开始告警日期筛选（当天新进入告警 / 已进入告警），再按到期日排序
+        Index("ix_inventory_records_warn_from", "warn_from", "expiry_date"),
+    )
 
     id = Column(String(36), primary_key=True)
-    item_type = Column(String(64), nullable=False, index=True)
+    item_type = Column(String(64), nullable=False)
     unit = Column(String(32), nullable=True, default="")
     quantity = Column(Integer, nullable=False)
-    expiry_date = Column(Date, nullable=False)
+    expiry_date = Column(Date, nullable=False, index=True)
     inbound_date = Column(Date, nullable=False)
     production_date = Column(String(32), nullable=True, default="")
     tag = Column(String(16), nullable=True, default="")
     location = Column(String(64), nullable=True, default="")
     photo = Column(String(512), nullable=True, default="")
     expiry_warning_days = Column(Integer, nullable=True, default=None)
-    create_time = Column(DateTime, server_default=func.now())
+    # 开始告警日期：expiry_date - (expiry_warning_days 或全局 EXPIRY_WARNING_DAYS)，写入时计算
+    warn_from = Column(Date, nullable=True)
+    create_time = Column(CreateTime, server_default=func.now())
@@ -1,19 +1,27 @@
-from sqlalchemy import Column, BigInteger, String, Integer, Date, DateTime
+from sqlalchemy import Column, BigInteger, String, Integer, Date, Index
 from sqlalchemy.sql import func
 
-from app.database import Base
+from app.database import Base, CreateTime
 
 
 class OutboundHistory(Base):
     """出库历史：记录每次成功出库的明细，关联用户"""
     __tablename__ = "outbound_history"
+    __table_args__ = (
+        # 我的出库按 (create_time, id) 游标分页
+        Index("ix_outbound_history_user_create_id", "user_id", "create_time", "id"),
+        # 出入库统计：按日期范围聚合各物品数量（覆盖索引）
+        Index("ix_outbound_history_date_item_qty", "outbound_date", "item_type", "quantity"),
+        # 出入库明细：按物品 + 日期范围
+        Index("ix_outbound_history_item_date", "item_type", "outbound_date"),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
-    user_id = Column(BigInteger, nullable=False, index=True)
-    item_type = Column(String(64), nullable=False, index=True)
+    user_id = Column(BigInteger, nullable=False)
+    item_type = Column(String(64), nullable=False)
     unit = Column(String(32), nullable=True, default="")
     quantity = Column(Integer, nullable=False)
     outbound_date = Column(Date, nullable=False)
     tag = Column(String(16), nullable=True, default="")
     location = Column(String(64), nullable=True, default="")
-    create_time = Column(DateTime, server_default=func.now())
+    create_time = Column(CreateTime, server_default=func.now())
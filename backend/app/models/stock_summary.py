@@ -0,0 +1,14 @@
+"""库存汇总：按 (item_type, unit) 维护总数量、批次数、最早到期日，随入库/出库在同一事务内增量更新"""
+from sqlalchemy import Column, String, Integer, Date
+
+from app.database import Base
+
+
+class StockSummary(Base):
+    __tablename__ = "stock_summary"
+
+    item_type = Column(String(64), primary_key=True)
+    unit = Column(String(32), primary_key=True, default="")
+    total_quantity = Column(Integer, nullable=False, default=0)
+    lot_count = Column(Integer, nullable=False, default=0)
+    earliest_expiry = Column(Date, nullable=True)
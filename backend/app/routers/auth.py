@@ -1,6 +1,7 @@
 import secrets
 
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
@@ -18,11 +19,10 @@ def get_client_ip(request: Request) -> str | None:
         return request.client.host
     return None
 from app.models.user import User
-from app.models.login_history import LoginHistory
-from app.models.register_history import RegisterHistory
-from app.core.auth import create_access_token
+from app.core.auth import create_access_token, invalidate_user_cache
+from app.services.audit_service import log_login, log_register
 from app.services.config_service import get_auth_config
-from app.services.wechat_service import code2session
+from app.services.wechat_service import code2session_async
 
 router = APIRouter()
 
@@ -56,20 +56,18 @@ def register(data: RegisterRequest, request: Request, db: Session = Depends(get_
     ip = get_client_ip(request)
     user = db.query(User).filter(User.phone == data.phone).first()
     if user is None:
-        db.add(RegisterHistory(openid=data.openid, ip=ip, phone=data.phone, success=False, user_id=None))
-        db.commit()
+        log_register(data.openid, ip, data.phone, False, None)
         raise HTTPException(status_code=401, detail="手机号未在系统中登记")
     if user.status != "正常":
-        db.add(RegisterHistory(openid=data.openid, ip=ip, phone=data.phone, success=False, user_id=None))
-        db.commit()
+        log_register(data.openid, ip, data.phone, False, None)
         raise HTTPException(status_code=401, detail="该账号不可注册")
     user.openid = data.openid
     user.passcode = data.passcode
     user.status = "已注册"
     db.commit()
     db.refresh(user)
-    db.add(RegisterHistory(openid=data.openid, ip=ip, phone=data.phone, success=True, user_id=user.id))
-    db.commit()
+    invalidate_user_cache(user.id)
+    log_register(data.openid, ip, data.phone, True, user.id)
     token = create_access_token(user.id)
     config = get_auth_config(db)
     return {
@@ -79,36 +77,37 @@ def register(data: RegisterRequest, request: Request, db: Session = Depends(get_
 
 
 @router.post("/register/wechat")
-def register_with_code(data: RegisterWithCodeRequest, request: Request, db: Session = Depends(get_db)):
+async def register_with_code(data: RegisterWithCodeRequest, request: Request, db: Session = Depends(get_db)):
     """小程序注册：必须先用 wx.login 获得 code，与手机号、密码一并提交"""
     ip = get_client_ip(request)
-    openid, err = code2session(data.code)
+    openid, err = await code2session_async(data.code)
     if err or not openid:
-        db.add(RegisterHistory(openid=None, ip=ip, phone=data.phone, success=False, user_id=None))
-        db.commit()
+        log_register(None, ip, data.phone, False, None)
         raise HTTPException(status_code=400, detail=err or "code 无效或已过期")
+    # 数据库操作为同步调用，放到线程池执行，避免阻塞事件循环
+    return await run_in_threadpool(_register_with_openid, db, openid, data, ip)
+
+
+def _register_with_openid(db: Session, openid: str, data: RegisterWithCodeRequest, ip: str | None) -> dict:
     # 已用本微信注册过的用户，提示勿重复注册
     already = db.query(User).filter(User.openid == openid, User.status == "已注册").first()
     if already:
-        db.add(RegisterHistory(openid=openid, ip=ip, phone=data.phone, success=False, user_id=already.id))
-        db.commit()
+        log_register(openid, ip, data.phone, False, already.id)
         raise HTTPException(status_code=400, detail="已经注册成功了，请不要重复注册")
     user = db.query(User).filter(User.phone == data.phone).first()
     if user is None:
-        db.add(RegisterHistory(openid=openid, ip=ip, phone=data.phone, success=False, user_id=None))
-        db.commit()
+        log_register(openid, ip, data.phone, False, None)
         raise HTTPException(status_code=401, detail="手机号未在系统中登记")
     if user.status != "正常":
-        db.add(RegisterHistory(openid=openid, ip=ip, phone=data.phone, success=False, user_id=None))
-        db.commit()
+        log_register(openid, ip, data.phone, False, None)
         raise HTTPException(status_code=401, detail="该账号不可注册")
     user.openid = openid
     user.passcode = data.passcode
     user.status = "已注册"
     db.commit()
     db.refresh(user)
-    db.add(RegisterHistory(openid=openid, ip=ip, phone=data.phone, success=True, user_id=user.id))
-    db.commit()
+    invalidate_user_cache(user.id)
+    log_register(openid, ip, data.phone, True, user.id)
     token = create_access_token(user.id)
     config = get_auth_config(db)
     return {
@@ -122,19 +121,15 @@ def get_token(data: TokenRequest, request: Request, db: Session = Depends(get_db
     ip = get_client_ip(request)
     user = db.query(User).filter(User.openid == data.openid).first()
     if user is None:
-        db.add(LoginHistory(openid=data.openid, ip=ip, user_id=None, success=False))
-        db.commit()
+        log_login(data.openid, ip, None, False)
         raise HTTPException(status_code=401, detail="未找到用户")
     if user.status != "已注册":
-        db.add(LoginHistory(openid=data.openid, ip=ip, user_id=user.id, success=False))
-        db.commit()
+        log_login(data.openid, ip, user.id, False)
         raise HTTPException(status_code=401, detail="账号状态异常")
     if not user.passcode or not secrets.compare_digest(user.passcode, data.passcode):
-        db.add(LoginHistory(openid=data.openid, ip=ip, user_id=user.id, success=False))
-        db.commit()
+        log_login(data.openid, ip, user.id, False)
         raise HTTPException(status_code=401, detail="passcode 不正确")
-    db.add(LoginHistory(openid=data.openid, ip=ip, user_id=user.id, success=True))
-    db.commit()
+    log_login(data.openid, ip, user.id, True)
     token = create_access_token(user.id)
     config = get_auth_config(db)
     return {
@@ -144,29 +139,28 @@ def get_token(data: TokenRequest, request: Request, db: Session = Depends(get_db
 
 
 @router.post("/token/wechat")
-def get_token_with_code(data: TokenWithCodeRequest, request: Request, db: Session = Depends(get_db)):
+async def get_token_with_code(data: TokenWithCodeRequest, request: Request, db: Session = Depends(get_db)):
     """小程序登录：每次使用时通过 wx.login 获得 code，与密码一并提交"""
     ip = get_client_ip(request)
-    openid, err = code2session(data.code)
+    openid, err = await code2session_async(data.code)
     if err or not openid:
-        db.add(LoginHistory(openid=openid, ip=ip, user_id=None, success=False))
-        db.commit()
+        log_login(openid, ip, None, False)
         raise HTTPException(status_code=400, detail=err or "code 无效或已过期")
+    return await run_in_threadpool(_login_with_openid, db, openid, data, ip)
+
+
+def _login_with_openid(db: Session, openid: str, data: TokenWithCodeRequest, ip: str | None) -> dict:
     user = db.query(User).filter(User.openid == openid).first()
     if user is None:
-        db.add(LoginHistory(openid=openid, ip=ip, user_id=None, success=False))
-        db.commit()
+        log_login(openid, ip, None, False)
         raise HTTPException(status_code=401, detail="未找到用户，请先注册")
     if user.status != "已注册":
-        db.add(LoginHistory(openid=openid, ip=ip, user_id=user.id, success=False))
-        db.commit()
+        log_login(openid, ip, user.id, False)
         raise HTTPException(status_code=401, detail="账号状态异常")
     if not user.passcode or not secrets.compare_digest(user.passcode, data.passcode):
-        db.add(LoginHistory(openid=openid, ip=ip, user_id=user.id, success=False))
-        db.commit()
+        log_login(openid, ip, user.id, False)
         raise HTTPException(status_code=401, detail="密码不正确")
-    db.add(LoginHistory(openid=openid, ip=ip, user_id=user.id, success=True))
-    db.commit()
+    log_login(openid, ip, user.id, True)
     token = create_access_token(user.id)
     config = get_auth_config(db)
     return {
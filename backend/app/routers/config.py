@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
 
 from app.core.auth import get_current_user
+from app.core.responses import content_etag, etag_headers, etag_matches, not_modified
 from app.models.user import User
-from app.services.config_service import get_config_value
+from app.routers.user import require_admin
+from app.services.config_service import (
+    get_auth_config,
+    get_config_cache_stats,
+    get_config_version,
+)
 from app.database import get_db
 from sqlalchemy.orm import Session
 
@@ -11,14 +18,26 @@ router = APIRouter()
 
 @router.get("/config")
 def get_config(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    data = {
-        "itemTypes": get_config_value(db, "ITEM_TYPES"),
-        "unit": get_config_value(db, "UNIT"),
-        "lowStockThreshold": get_config_value(db, "LOW_STOCK_THRESHOLD"),
-        "expiryWarningDays": get_config_value(db, "EXPIRY_WARNING_DAYS"),
-        "expiry": get_config_value(db, "EXPIRY"),
-    }
-    return {"success": True, "data": data}
+    """支持 If-None-Match：配置内容未变时返回 304。
+    ETag 取内容哈希而非版本号：直接改表或 scripts/init_data.py 写入不会递增版本号，
+    这类修改在配置缓存过期（CONFIG_CACHE_TTL）后即反映到 ETag。
+    先读版本号：本进程之外经 set_config_value 的修改会立即使缓存失效"""
+    get_config_version(db)
+    data = get_auth_config(db)
+    etag = content_etag("config", data)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return JSONResponse({"success": True, "data": data}, headers=etag_headers(etag))
+
+
+@router.get("/config/cache-stats")
+def get_config_cache(
+    current_user: User = Depends(get_current_user),
+):
+    """配置缓存命中统计（仅管理员）"""
+    require_admin(current_user)
+    return {"success": True, "data": get_config_cache_stats()}
@@ -4,8 +4,8 @@ from fastapi import APIRouter, Depends
 
 from app.core.auth import get_current_user
 from app.models.user import User
-from app.schemas.inbound import InboundRequest
-from app.services.inventory_service import add_inbound
+from app.schemas.inbound import InboundBatchRequest, InboundRequest
+from app.services.inventory_service import add_inbound, add_inbound_batch
 from app.services.config_service import ensure_item_type, ensure_unit
 from app.database import get_db
 from sqlalchemy.orm import Session
@@ -45,3 +45,39 @@ def inbound(
         return {"success": True, "data": {"id": record_id}}
     except ValueError as e:
         return {"success": False, "message": str(e)}
+
+
+@router.post("/inbound/batch")
+def inbound_batch(
+    data: InboundBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """批量入库：逐条校验，全部通过才在同一事务内写入；任一条校验失败则都不入库，并返回失败的条目。
+    成功时 items 与请求顺序一一对应，为 {"index", "id"}"""
+    errors: list[dict] = []
+    valid: list[dict] = []
+    for index, item in enumerate(data.items):
+        try:
+            date.fromisoformat(item.expiryDate)
+            date.fromisoformat(item.inboundDate)
+        except ValueError:
+            errors.append({"index": index, "message": "日期格式错误，请使用 YYYY-MM-DD"})
+            continue
+        valid.append({
+            "item_type": item.itemType,
+            "quantity": item.quantity,
+            "expiry_date": item.expiryDate,
+            "inbound_date": item.inboundDate,
+            "production_date": item.productionDate or "",
+            "expiry_warning_days": item.expiryWarningDays,
+            "unit": item.unit or "",
+            "tag": item.tag or "",
+            "location": item.location or "",
+            "photo": item.photo or "",
+        })
+    if errors:
+        return {"success": False, "message": "部分物品无法入库", "data": {"items": errors}}
+    record_ids = add_inbound_batch(db, current_user.id, valid)
+    items = [{"index": index, "id": record_id} for index, record_id in enumerate(record_ids)]
+    return {"success": True, "data": {"items": items, "created": len(items)}}
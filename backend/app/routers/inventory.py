@@ -1,47 +1,186 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 
 from app.core.auth import get_current_user
+from app.core.responses import (
+    FastJSONResponse,
+    content_etag,
+    etag_headers,
+    etag_matches,
+    make_etag,
+    not_modified,
+)
 from app.models.user import User
 from app.services.inventory_service import (
+    MAX_PAGE_SIZE,
+    OVERVIEW_SORTS,
     get_overview,
+    get_overview_async,
+    get_expiring,
+    get_expiry_buckets,
     get_outbound_list,
     get_io_stats_by_range,
+    get_io_stats_by_range_async,
     get_io_details,
     get_my_inbound,
     get_my_outbound,
 )
-from app.database import get_db
+from app.services.export_service import iter_csv, iter_io_rows, iter_xlsx
+from app.services.stock_summary_service import get_low_stock, get_stock_summary
+from app.services.version_service import INVENTORY_VERSION, get_version, get_version_async
+from app.database import get_async_db, get_db, run_read
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 router = APIRouter()
 
 
 @router.get("/overview")
-def overview(
+async def overview(
+    request: Request,
+    itemType: str | None = None,
+    location: str | None = None,
+    tag: str | None = None,
+    warningOnly: bool = False,
+    expiringWithinDays: int | None = None,
+    sort: str = "daysRemaining",
+    page: int = 1,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+    async_db: AsyncSession | None = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """sort: daysRemaining|inboundDate|itemType。不传 limit 时返回全部记录（兼容旧版小程序），
+    传入时须在 1..MAX_PAGE_SIZE 之间。
+    支持 If-None-Match：库存未变（且未跨天，剩余天数不变）时返回 304"""
+    if sort not in OVERVIEW_SORTS:
+        sort = "daysRemaining"
+    version = await run_read(async_db, db, get_version_async, get_version, INVENTORY_VERSION)
+    etag = make_etag("inv", version, date.today().isoformat())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    try:
+        items, has_more, next_cursor = await run_read(
+            async_db,
+            db,
+            get_overview_async,
+            get_overview,
+            item_type=itemType,
+            location=location,
+            tag=tag,
+            warning_only=warningOnly,
+            expiring_within_days=expiringWithinDays,
+            sort=sort,
+            page=page,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    return FastJSONResponse(
+        {
+            "success": True,
+            "data": {"items": items, "hasMore": has_more, "nextCursor": next_cursor},
+        },
+        headers=etag_headers(etag),
+    )
+
+
+@router.get("/expiring")
+def expiring(
+    day: str | None = None,
+    newOnly: bool = False,
+    itemType: str | None = None,
+    page: int = 1,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    data = get_overview(db)
+    """已进入到期告警的批次（按批次 expiryWarningDays，未设置时按全局 EXPIRY_WARNING_DAYS），
+    newOnly=true 时仅返回 day（YYYY-MM-DD，默认今天）当天新进入告警的批次；
+    buckets 为 EXPIRY 配置各月数窗口内即将到期的批次数与数量"""
+    try:
+        target = date.fromisoformat(day) if day else date.today()
+        items, has_more, next_cursor = get_expiring(
+            db,
+            day=target,
+            new_only=newOnly,
+            item_type=itemType,
+            page=page,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    return FastJSONResponse(
+        {
+            "success": True,
+            "data": {
+                "items": items,
+                "hasMore": has_more,
+                "nextCursor": next_cursor,
+                "buckets": get_expiry_buckets(db, day=target, item_type=itemType),
+            },
+        }
+    )
+
+
+@router.get("/summary")
+def stock_summary(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """按物品类型、单位的库存汇总（总数量、批次数、最早到期日）"""
+    data = get_stock_summary(db)
     return {"success": True, "data": {"items": data}}
 
 
+@router.get("/low-stock")
+def low_stock(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """库存低于阈值（LOW_STOCK_THRESHOLD，或 LOW_STOCK_THRESHOLDS 中的物品单独阈值）的物品与单位。
+    支持 If-None-Match：库存与阈值未变时返回 304"""
+    items, key = get_low_stock(db)
+    etag = content_etag("low", key)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return FastJSONResponse(
+        {"success": True, "data": {"items": items}}, headers=etag_headers(etag)
+    )
+
+
 @router.get("/outbound-list")
 def outbound_list(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    """支持 If-None-Match：库存未变时返回 304"""
+    etag = make_etag("inv", get_version(db, INVENTORY_VERSION))
+    if etag_matches(request, etag):
+        return not_modified(etag)
     data = get_outbound_list(db)
-    return {"success": True, "data": {"items": data}}
+    return FastJSONResponse({"success": True, "data": {"items": data}}, headers=etag_headers(etag))
 
 
 @router.get("/io-stats")
-def io_stats(
+async def io_stats(
     startDate: str,
     endDate: str,
     db: Session = Depends(get_db),
+    async_db: AsyncSession | None = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    data = get_io_stats_by_range(db, startDate, endDate)
+    data = await run_read(
+        async_db, db, get_io_stats_by_range_async, get_io_stats_by_range, startDate, endDate
+    )
     return {"success": True, "data": {"items": data}}
 
 
@@ -51,34 +190,98 @@ def io_details(
     startDate: str,
     endDate: str,
     type: str = "both",
+    page: int = 1,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    withTotal: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    """type=both 按日期倒序、同一天出库在前，只查入库或出库时按创建时间倒序。
+    传 limit 时分页（cursor 为上一页返回的 nextCursor），withTotal=true 时返回总条数"""
     if type not in ("inbound", "outbound", "both"):
         type = "both"
-    data = get_io_details(db, itemType, startDate, endDate, type)
-    return {"success": True, "data": {"items": data}}
+    try:
+        items, has_more, next_cursor, total = get_io_details(
+            db, itemType, startDate, endDate, type, page, limit, cursor, withTotal
+        )
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    data = {"items": items, "hasMore": has_more, "nextCursor": next_cursor}
+    if withTotal:
+        data["total"] = total
+    return {"success": True, "data": data}
+
+
+EXPORT_FORMATS = {
+    "csv": (iter_csv, "text/csv; charset=utf-8"),
+    "xlsx": (iter_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+@router.get("/export")
+def export_io(
+    startDate: str,
+    endDate: str,
+    itemType: str | None = None,
+    type: str = "both",
+    format: str = "csv",
+    current_user: User = Depends(get_current_user),
+):
+    """流式导出出入库明细（筛选条件同 io-details，itemType 不传则导出全部物品）。format: csv|xlsx"""
+    if type not in ("inbound", "outbound", "both"):
+        type = "both"
+    if format not in EXPORT_FORMATS:
+        return {"success": False, "message": "format 仅支持 csv、xlsx"}
+    try:
+        start = date.fromisoformat(startDate)
+        end = date.fromisoformat(endDate)
+    except ValueError:
+        return {"success": False, "message": "日期格式应为 YYYY-MM-DD"}
+    writer, media_type = EXPORT_FORMATS[format]
+    filename = f"io_{type}_{start.isoformat()}_{end.isoformat()}.{format}"
+    return StreamingResponse(
+        writer(iter_io_rows(itemType, start, end, type)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/my-inbound")
 def my_inbound(
     page: int = 1,
-    limit: int = 5,
+    limit: int = Query(5, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    items, has_more = get_my_inbound(db, current_user.id, page, limit)
-    return {"success": True, "data": {"items": items, "hasMore": has_more}}
+    """传 cursor（上一页返回的 nextCursor）时按游标翻页，否则按 page 分页"""
+    try:
+        items, has_more, next_cursor = get_my_inbound(db, current_user.id, page, limit, cursor)
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    return FastJSONResponse({
+        "success": True,
+        "data": {"items": items, "hasMore": has_more, "nextCursor": next_cursor},
+    })
 
 
 @router.get("/my-outbound")
 def my_outbound(
     page: int = 1,
-    limit: int = 5,
+    limit: int = Query(5, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    items, has_more = get_my_outbound(db, current_user.id, page, limit)
-    return {"success": True, "data": {"items": items, "hasMore": has_more}}
+    """传 cursor（上一页返回的 nextCursor）时按游标翻页，否则按 page 分页"""
+    try:
+        items, has_more, next_cursor = get_my_outbound(db, current_user.id, page, limit, cursor)
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    return FastJSONResponse({
+        "success": True,
+        "data": {"items": items, "hasMore": has_more, "nextCursor": next_cursor},
+    })
 
 
@@ -0,0 +1,50 @@
+"""Prometheus 指标（无需 token，建议仅对内网/抓取端开放）"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.auth import get_auth_cache_stats
+from app.core.metrics import CONTENT_TYPE, CounterCollector, Gauge, render_metrics
+from app.services.audit_service import audit_writer
+from app.services.config_service import get_config_cache_stats
+from app.services.stock_summary_service import get_low_stock_cache_stats
+
+router = APIRouter()
+
+
+def _cache_stats() -> dict[str, dict]:
+    auth = get_auth_cache_stats()
+    return {
+        "config": get_config_cache_stats(),
+        "auth_token": auth["token"],
+        "auth_user": auth["user"],
+        "low_stock": get_low_stock_cache_stats(),
+    }
+
+
+def _cache_field(field: str):
+    return lambda: {
+        (name,): stats[field] for name, stats in _cache_stats().items() if field in stats
+    }
+
+
+CounterCollector("cache_hits_total", "进程内缓存命中次数", ("cache",), collect=_cache_field("hits"))
+CounterCollector("cache_misses_total", "进程内缓存未命中次数", ("cache",), collect=_cache_field("misses"))
+Gauge("cache_size", "进程内缓存条目数", ("cache",), collect=_cache_field("size"))
+
+_AUDIT_EVENTS = ("queued", "written", "batches", "overflow", "direct", "failed")
+CounterCollector(
+    "audit_writer_events_total",
+    "登录/注册历史写入队列的累计事件数",
+    ("event",),
+    collect=lambda: {(k,): v for k, v in audit_writer.stats().items() if k in _AUDIT_EVENTS},
+)
+Gauge(
+    "audit_writer_pending",
+    "登录/注册历史写入队列中待写入的记录数",
+    collect=lambda: {(): audit_writer.stats()["pending"]},
+)
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
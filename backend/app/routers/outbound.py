@@ -2,8 +2,8 @@ from fastapi import APIRouter, Depends
 
 from app.core.auth import get_current_user
 from app.models.user import User
-from app.schemas.outbound import OutboundRequest
-from app.services.inventory_service import outbound_fifo, outbound_by_id
+from app.schemas.outbound import OutboundBatchRequest, OutboundRequest
+from app.services.inventory_service import outbound_batch, outbound_fifo, outbound_by_id
 from app.database import get_db
 from sqlalchemy.orm import Session
 
@@ -29,3 +29,25 @@ def outbound(
     if success:
         return {"success": True}
     return {"success": False, "message": message}
+
+
+@router.post("/outbound/batch")
+def outbound_multi(
+    data: OutboundBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """多行出库（如一张领料单），同一事务内全部出库；任一行不足则都不出库，并返回不足的行"""
+    lines = [
+        {
+            "id": item.id,
+            "item_type": item.itemType,
+            "quantity": item.quantity,
+            "outbound_date": item.outboundDate,
+        }
+        for item in data.items
+    ]
+    success, errors = outbound_batch(db, current_user.id, lines)
+    if success:
+        return {"success": True}
+    return {"success": False, "message": "部分物品无法出库", "data": {"items": errors}}
@@ -1,33 +1,43 @@
-import uuid
-from datetime import datetime
-from pathlib import Path
+from fastapi import APIRouter, Depends, Request
 
-from fastapi import APIRouter, Depends, UploadFile, File
-
-from app.config import settings
 from app.core.auth import get_current_user
 from app.models.user import User
+from app.services.image_service import derivative_url, generate_derivatives
+from app.services.upload_service import receive_image
 
 router = APIRouter()
 
-ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+# 请求体由 receive_image 流式解析，不声明 File 参数，这里补充 OpenAPI 中的表单说明
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
 
 
-@router.post("/upload/image")
+@router.post("/upload/image", openapi_extra=UPLOAD_REQUEST_BODY)
 async def upload_image(
-    file: UploadFile = File(...),
+    request: Request,
     current_user: User = Depends(get_current_user),
 ):
-    suffix = Path(file.filename or "").suffix.lower()
-    if suffix not in ALLOWED_EXTENSIONS:
-        suffix = ".jpg"  # 小程序上传时 filename 可能无后缀，默认按 jpg 处理
-    date_dir = datetime.now().strftime("%Y%m%d")
-    dir_path = Path(settings.upload_dir) / date_dir
-    dir_path.mkdir(parents=True, exist_ok=True)
-    ext = suffix or ".jpg"
-    filename = f"{uuid.uuid4().hex}{ext}"
-    file_path = dir_path / filename
-    content = await file.read()
-    file_path.write_bytes(content)
-    url = f"/uploads/{date_dir}/{filename}"
-    return {"success": True, "data": {"url": url}}
+    """multipart 字段 file。图片格式以文件头为准（JPG/PNG/GIF/WEBP），大小上限见 UPLOAD_MAX_BYTES：
+    Content-Length 超限时不接收请求体直接拒绝，否则边接收边写盘（写盘在线程池中分块进行），
+    超限即中止；未登录时在读取请求体前即返回 401。缩略图与 WebP 大图在进程池中生成，均不阻塞事件循环"""
+    try:
+        url = await receive_image(request)
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    data = {"url": url}
+    if await generate_derivatives(url):
+        data["thumb"] = derivative_url(url, "thumb")
+        data["large"] = derivative_url(url, "large")
+    return {"success": True, "data": data}
@@ -2,7 +2,7 @@
 import re
 from fastapi import APIRouter, Depends, HTTPException
 
-from app.core.auth import get_current_user
+from app.core.auth import get_current_user, invalidate_user_cache
 from app.models.user import User
 from app.schemas.user import PasscodeUpdate, AdminUserCreate, AdminUserUpdate
 from app.database import get_db
@@ -37,8 +37,12 @@ def update_passcode(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    current_user.passcode = data.passcode
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="用户不存在")
+    user.passcode = data.passcode
     db.commit()
+    invalidate_user_cache(user.id)
     return {"success": True}
 
 
@@ -111,4 +115,5 @@ def admin_update_user(
     if data.status is not None:
         user.status = data.status
     db.commit()
+    invalidate_user_cache(user_id)
     return {"success": True}
@@ -2,7 +2,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
-from app.services.wechat_service import getPhoneNumber
+from app.services.wechat_service import get_phone_number_async
 
 router = APIRouter()
 
@@ -12,9 +12,9 @@ class GetPhoneRequest(BaseModel):
 
 
 @router.post("/get-phone-number")
-def get_phone_number(data: GetPhoneRequest):
+async def get_phone_number(data: GetPhoneRequest):
     """小程序端 getPhoneNumber 授权后，用 code 换取手机号，用于注册时默认填入"""
-    phone, err = getPhoneNumber(data.code)
+    phone, err = await get_phone_number_async(data.code)
     if err or not phone:
         raise HTTPException(status_code=400, detail=err or "获取手机号失败")
     return {"success": True, "data": {"phone": phone}}
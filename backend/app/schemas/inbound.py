@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 
 class InboundRequest(BaseModel):
@@ -13,3 +13,7 @@ class InboundRequest(BaseModel):
     tag: Optional[str] = Field(default="", description="标签颜色 hex")
     location: Optional[str] = Field(default="", description="位置")
     photo: Optional[str] = Field(default="", description="图片 URL")
+
+
+class InboundBatchRequest(BaseModel):
+    items: List[InboundRequest] = Field(..., min_length=1, max_length=500, description="入库明细")
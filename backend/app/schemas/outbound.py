@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic import BaseModel, Field
 
 
@@ -6,3 +8,7 @@ class OutboundRequest(BaseModel):
     itemType: str = Field(..., description="物品类型")
     quantity: int = Field(..., gt=0, description="出库数量")
     outboundDate: str = Field(..., description="出库日期 YYYY-MM-DD")
+
+
+class OutboundBatchRequest(BaseModel):
+    items: List[OutboundRequest] = Field(..., min_length=1, max_length=200, description="出库明细，全部成功才提交")
@@ -0,0 +1,149 @@
+"""登录/注册历史的异步批量写入
+
+请求线程只把记录放入有界队列，后台线程按条数或时间间隔批量 INSERT，
+登录接口的延迟不再受审计表写入速度影响。队列已满时退化为同步写入（计入 overflow），
+未启动时（如脚本中）直接同步写入（计入 direct），记录不会因缓冲区满而丢失。
+login_time / register_time 不由应用填写，由数据库的 server_default 在写入时按数据库时钟生成
+（与其他表的 create_time 同一时钟，不受各应用服务器时钟偏差影响），比事件发生晚至多一个写入间隔。
+"""
+import logging
+import queue
+import threading
+import time
+
+from sqlalchemy import insert
+
+from app.database import SessionLocal
+from app.models.login_history import LoginHistory
+from app.models.register_history import RegisterHistory
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class AuditWriter:
+    def __init__(self, batch_size: int = 200, flush_interval: float = 1.0, max_pending: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread: threading.Thread | None = None
+        self._stats_lock = threading.Lock()
+        self._stats = {"queued": 0, "written": 0, "batches": 0, "overflow": 0, "direct": 0, "failed": 0}
+
+    def _incr(self, key: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += n
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """停止后台线程，退出前写完队列中剩余记录"""
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def record(self, model, values: dict) -> None:
+        if self.running:
+            try:
+                self._queue.put_nowait((model, values))
+                self._incr("queued")
+                return
+            except queue.Full:
+                self._incr("overflow")
+        else:
+            self._incr("direct")
+        self._write([(model, values)])
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {**self._stats, "pending": self._queue.qsize(), "running": self.running}
+
+    def _run(self) -> None:
+        batch: list = []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            if batch and (
+                stopping or len(batch) >= self.batch_size or time.monotonic() >= deadline
+            ):
+                self._write(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+        # 退出前写完 stop 之后仍在队列中的记录
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                batch.append(item)
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch: list) -> None:
+        by_model: dict = {}
+        for model, values in batch:
+            by_model.setdefault(model, []).append(values)
+        db = SessionLocal()
+        try:
+            for model, rows in by_model.items():
+                db.execute(insert(model), rows)
+            db.commit()
+            self._incr("written", len(batch))
+            self._incr("batches")
+        except Exception:
+            db.rollback()
+            self._incr("failed", len(batch))
+            logger.exception("写入登录/注册历史失败，丢弃 %d 条", len(batch))
+        finally:
+            db.close()
+
+
+audit_writer = AuditWriter()
+
+
+def log_login(openid: str | None, ip: str | None, user_id: int | None, success: bool) -> None:
+    audit_writer.record(
+        LoginHistory,
+        {
+            "openid": openid,
+            "ip": ip,
+            "user_id": user_id,
+            "success": success,
+        },
+    )
+
+
+def log_register(
+    openid: str | None, ip: str | None, phone: str, success: bool, user_id: int | None
+) -> None:
+    audit_writer.record(
+        RegisterHistory,
+        {
+            "openid": openid,
+            "ip": ip,
+            "phone": phone,
+            "success": success,
+            "user_id": user_id,
+        },
+    )
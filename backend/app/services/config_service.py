@@ -1,65 +1,153 @@
+import copy
 import json
+import threading
+import time
 from typing import Any
 
 from sqlalchemy.orm import Session
 
 from app.models.config import Config
+from app.services.version_service import (
+    CONFIG_VERSION,
+    bump_version,
+    commit_and_bump,
+    get_version,
+)
 
 DEFAULT_CONFIG = {
     "ITEM_TYPES": ["大米", "油", "肉", "鸡蛋"],
     "UNIT": [],
     "LOW_STOCK_THRESHOLD": 10,
+    "LOW_STOCK_THRESHOLDS": {},  # 物品类型 -> 单独的低库存阈值
     "EXPIRY_WARNING_DAYS": 7,
     "EXPIRY": [1, 3, 6],
 }
 
 
-def get_config_value(db: Session, key: str) -> Any:
-    row = db.query(Config).filter(Config.key == key).first()
-    if row is None or row.value is None:
-        return DEFAULT_CONFIG.get(key)
+# 进程内配置缓存：一次查询载入全部 key，TTL 内直接读内存；本进程写入后立即失效，
+# 其他进程（多 worker、脚本直接改表）的修改最迟 TTL 后可见。
+# get_config_version 发现版本号与载入时不同会立即失效缓存（/config 的 ETag 依赖这一点）
+CONFIG_CACHE_TTL = 60.0
+
+_cache: tuple[dict, float, int] | None = None  # (key -> 解析后的值, 过期时间, 载入时的版本号)
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _parse_value(value: str) -> Any:
     try:
-        return json.loads(row.value)
+        return json.loads(value)
     except (json.JSONDecodeError, TypeError):
-        return row.value
+        return value
 
 
-def ensure_item_type(db: Session, item_type: str) -> None:
-    """若 item_type 不在 config 的 ITEM_TYPES 中，则追加并写回 config 表"""
-    if not (item_type and item_type.strip()):
-        return
-    item_type = item_type.strip()
-    current = get_config_value(db, "ITEM_TYPES")
-    if not isinstance(current, list):
-        current = list(DEFAULT_CONFIG.get("ITEM_TYPES", []))
-    if item_type in current:
-        return
-    current.append(item_type)
-    row = db.query(Config).filter(Config.key == "ITEM_TYPES").first()
+def _get_all_config(db: Session) -> dict:
+    global _cache
+    cached = _cache
+    if cached is not None and cached[1] > time.monotonic():
+        _cache_stats["hits"] += 1
+        return cached[0]
+    with _cache_lock:
+        cached = _cache
+        if cached is not None and cached[1] > time.monotonic():
+            _cache_stats["hits"] += 1
+            return cached[0]
+        _cache_stats["misses"] += 1
+        version = get_version(db, CONFIG_VERSION)
+        values = {
+            row.key: _parse_value(row.value)
+            for row in db.query(Config).all()
+            if row.value is not None
+        }
+        _cache = (values, time.monotonic() + CONFIG_CACHE_TTL, version)
+        return values
+
+
+def invalidate_config_cache() -> None:
+    """config 表被修改后调用，下次读取重新载入"""
+    global _cache
+    _cache = None
+
+
+def get_config_version(db: Session) -> int:
+    """当前配置版本号；与缓存载入时的版本不同（其他进程改过配置）则使缓存失效"""
+    version = get_version(db, CONFIG_VERSION)
+    cached = _cache
+    if cached is not None and cached[2] != version:
+        invalidate_config_cache()
+    return version
+
+
+def get_config_cache_stats() -> dict:
+    """缓存命中/未命中次数；未命中次数即访问 config 表的次数"""
+    return {**_cache_stats, "cached": _cache is not None, "ttl": CONFIG_CACHE_TTL}
+
+
+def get_config_value(db: Session, key: str) -> Any:
+    values = _get_all_config(db)
+    value = values[key] if key in values else DEFAULT_CONFIG.get(key)
+    # 返回副本，避免调用方修改缓存中的列表
+    return copy.deepcopy(value)
+
+
+def set_config_value(db: Session, key: str, value: Any, commit: bool = True) -> None:
+    """写入（JSON 序列化）、递增配置版本号并提交，随后使缓存失效。
+    commit=False 时仅写入当前事务，调用方须以 commit_and_bump 提交，
+    随后调用 invalidate_config_cache"""
+    row = db.query(Config).filter(Config.key == key).first()
     if row is None:
-        db.add(Config(key="ITEM_TYPES", value=json.dumps(current)))
+        db.add(Config(key=key, value=json.dumps(value)))
     else:
-        row.value = json.dumps(current)
-    db.commit()
+        row.value = json.dumps(value)
+    if key == "EXPIRY_WARNING_DAYS":
+        # 延迟导入：inventory_service 依赖本模块
+        from app.services.inventory_service import refresh_default_warn_from
+
+        refresh_default_warn_from(db, int(value))
+    bump_version(db, CONFIG_VERSION)
+    if commit:
+        commit_and_bump(db)
+        invalidate_config_cache()
+
+
+def _ensure_in_list(db: Session, key: str, values: list[str], commit: bool) -> bool:
+    """把 values 中尚未出现在 config 列表 key 的非空项追加并写回，返回是否有写入"""
+    wanted = list(dict.fromkeys(v.strip() for v in values if v and v.strip()))
+    if not wanted:
+        return False
+    cached = get_config_value(db, key)
+    if isinstance(cached, list) and all(v in cached for v in wanted):
+        return False
+    # 缓存可能落后于其他进程的写入，追加前以表中当前值为准
+    row = db.query(Config).filter(Config.key == key).first()
+    current = _parse_value(row.value) if row is not None and row.value is not None else None
+    if not isinstance(current, list):
+        current = list(DEFAULT_CONFIG.get(key, []))
+    added = [v for v in wanted if v not in current]
+    if not added:
+        return False
+    set_config_value(db, key, current + added, commit=commit)
+    return True
+
+
+def ensure_item_types(db: Session, item_types: list[str], commit: bool = True) -> bool:
+    """把不在 config 的 ITEM_TYPES 中的物品类型一次性追加并写回"""
+    return _ensure_in_list(db, "ITEM_TYPES", item_types, commit)
+
+
+def ensure_units(db: Session, units: list[str], commit: bool = True) -> bool:
+    """把不在 config 的 UNIT 中的单位一次性追加并写回"""
+    return _ensure_in_list(db, "UNIT", units, commit)
+
+
+def ensure_item_type(db: Session, item_type: str) -> None:
+    """若 item_type 不在 config 的 ITEM_TYPES 中，则追加并写回 config 表"""
+    ensure_item_types(db, [item_type])
 
 
 def ensure_unit(db: Session, unit: str) -> None:
     """若 unit 不在 config 的 UNIT 中，则追加并写回 config 表"""
-    if not (unit and unit.strip()):
-        return
-    unit = unit.strip()
-    current = get_config_value(db, "UNIT")
-    if not isinstance(current, list):
-        current = list(DEFAULT_CONFIG.get("UNIT", []))
-    if unit in current:
-        return
-    current.append(unit)
-    row = db.query(Config).filter(Config.key == "UNIT").first()
-    if row is None:
-        db.add(Config(key="UNIT", value=json.dumps(current)))
-    else:
-        row.value = json.dumps(current)
-    db.commit()
+    ensure_units(db, [unit])
 
 
 def get_auth_config(db: Session) -> dict:
@@ -68,6 +156,7 @@ def get_auth_config(db: Session) -> dict:
         "itemTypes": get_config_value(db, "ITEM_TYPES"),
         "unit": get_config_value(db, "UNIT"),
         "lowStockThreshold": get_config_value(db, "LOW_STOCK_THRESHOLD"),
+        "lowStockThresholds": get_config_value(db, "LOW_STOCK_THRESHOLDS"),
         "expiryWarningDays": get_config_value(db, "EXPIRY_WARNING_DAYS"),
         "expiry": get_config_value(db, "EXPIRY"),
     }
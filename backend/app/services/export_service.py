@@ -0,0 +1,164 @@
+"""出入库明细导出：CSV / XLSX 流式生成
+
+明细通过 yield_per 分批读取（MySQL 下为服务端游标），逐块编码后交给 StreamingResponse，
+内存占用与导出行数无关。XLSX 由 zipfile 直接写入不可 seek 的输出流，不依赖 openpyxl，
+工作表使用内联字符串，无需先收集共享字符串表。
+"""
+import csv
+import io
+import re
+import zipfile
+from datetime import date
+from typing import Iterable, Iterator
+from xml.sax.saxutils import escape
+
+from app.database import SessionLocal
+from app.services.inventory_service import io_details_select
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+EXPORT_HEADERS = ["类型", "日期", "物品类型", "数量", "单位", "存放位置", "过期日期", "标签", "操作人", "创建时间"]
+_TYPE_LABELS = {"inbound": "入库", "outbound": "出库"}
+
+# XML 1.0 不允许的控制字符
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def iter_io_rows(
+    item_type: str | None, start: date, end: date, detail_type: str
+) -> Iterator[tuple]:
+    """逐行产出导出数据。使用独立会话：StreamingResponse 迭代时请求依赖的会话可能已关闭"""
+    db = SessionLocal()
+    try:
+        stmt = io_details_select(item_type, start, end, detail_type).execution_options(
+            yield_per=EXPORT_BATCH_SIZE
+        )
+        for r in db.execute(stmt):
+            yield (
+                _TYPE_LABELS.get(r.type, r.type),
+                r.date.isoformat() if r.date else "",
+                r.item_type,
+                r.quantity,
+                r.unit or "",
+                r.location or "",
+                r.expiry_date.isoformat() if r.expiry_date else "",
+                r.tag or "",
+                r.user_name or "",
+                r.create_time.strftime("%Y-%m-%d %H:%M:%S") if r.create_time else "",
+            )
+    finally:
+        db.close()
+
+
+def iter_csv(rows: Iterable[tuple]) -> Iterator[bytes]:
+    """UTF-8 CSV（带 BOM，Excel 直接打开中文不乱码）"""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write("﻿")
+    writer.writerow(EXPORT_HEADERS)
+    for row in rows:
+        writer.writerow(row)
+        if buf.tell() >= EXPORT_CHUNK_BYTES:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode("utf-8")
+
+
+class _ChunkSink:
+    """zipfile 的输出目标：不支持 seek/tell，zipfile 会改用数据描述符写入；写入内容由调用方取走"""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    "</Types>"
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="出入库明细" sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    "</Relationships>"
+)
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = "</sheetData></worksheet>"
+
+
+def _xlsx_cell(value) -> str:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_ILLEGAL_XML.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values) -> str:
+    return "<row>" + "".join(_xlsx_cell(v) for v in values) + "</row>"
+
+
+def iter_xlsx(rows: Iterable[tuple]) -> Iterator[bytes]:
+    """单工作表 XLSX，边压缩边产出"""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        zf.writestr("xl/workbook.xml", _WORKBOOK)
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            pending = [_SHEET_HEAD, _xlsx_row(EXPORT_HEADERS)]
+            size = 0
+            for row in rows:
+                text = _xlsx_row(row)
+                pending.append(text)
+                size += len(text)
+                if size >= EXPORT_CHUNK_BYTES:
+                    sheet.write("".join(pending).encode("utf-8"))
+                    pending.clear()
+                    size = 0
+                    data = sink.take()
+                    if data:
+                        yield data
+            pending.append(_SHEET_TAIL)
+            sheet.write("".join(pending).encode("utf-8"))
+    yield sink.take()
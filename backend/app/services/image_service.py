@@ -0,0 +1,114 @@
+"""图片衍生图：缩略图与 WebP 大图
+
+上传的原图（手机照片常见 3–8MB）旁生成两张 WebP：
+  <uuid>_thumb.webp  长边 THUMB_SIZE，列表页使用
+  <uuid>_large.webp  长边 LARGE_SIZE，详情页使用
+解码与缩放在进程池中执行（CPU 密集，不占用事件循环与请求线程）。
+衍生图文件名由原图 URL 推得，接口无需查询文件是否存在；
+生成失败或历史图片尚未回填（scripts/backfill_thumbnails.py）时客户端应回退到原图。
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+THUMB_SIZE = 320
+LARGE_SIZE = 1280
+WEBP_QUALITY = 80
+DERIVATIVES = {"thumb": THUMB_SIZE, "large": LARGE_SIZE}
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+
+_URL_PREFIX = "/uploads/"
+_executor: ProcessPoolExecutor | None = None
+
+
+def is_derivative(path: Path) -> bool:
+    return any(path.stem.endswith(f"_{name}") for name in DERIVATIVES)
+
+
+def derivative_path(original: Path, name: str) -> Path:
+    return original.with_name(f"{original.stem}_{name}.webp")
+
+
+def derivative_url(photo: str | None, name: str = "thumb") -> str:
+    """原图 URL 对应的衍生图 URL；不是本服务上传的图片时返回空字符串"""
+    if not photo or not photo.startswith(_URL_PREFIX):
+        return ""
+    stem, dot, _ = photo.rpartition(".")
+    if not dot or "/" in photo[len(stem):]:
+        return ""
+    return f"{stem}_{name}.webp"
+
+
+def url_to_path(url: str) -> Path:
+    return Path(settings.upload_dir) / url[len(_URL_PREFIX):]
+
+
+def make_derivatives(original: str, force: bool = False) -> list[str]:
+    """为原图生成全部衍生图（已存在的跳过，force 时重建），返回新生成的文件路径。
+    在进程池中执行；写入临时文件后原子重命名"""
+    src = Path(original)
+    targets = {
+        name: derivative_path(src, name)
+        for name in DERIVATIVES
+        if force or not derivative_path(src, name).exists()
+    }
+    if not targets:
+        return []
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)  # 手机照片按 EXIF 方向摆正
+        if im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if "transparency" in im.info or im.mode in ("LA", "PA") else "RGB")
+        created = []
+        for name, target in targets.items():
+            size = DERIVATIVES[name]
+            resized = im.copy()
+            resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+            fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".derive-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    resized.save(out, "WEBP", quality=WEBP_QUALITY, method=4)
+                os.chmod(tmp, 0o644)
+                os.replace(tmp, target)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            created.append(str(target))
+    return created
+
+
+def get_image_pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn：不继承父进程的数据库连接与后台线程
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.image_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown_image_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+async def generate_derivatives(url: str) -> bool:
+    """在进程池中为刚上传的图片生成衍生图，失败只记录日志（原图仍可用）"""
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(get_image_pool(), make_derivatives, str(url_to_path(url)))
+        return True
+    except Exception:
+        logger.exception("生成衍生图失败: %s", url)
+        return False
@@ -1,14 +1,71 @@
-from datetime import date, datetime
-from typing import List
+import base64
+import calendar
+import json
+import time
+from datetime import date, datetime, timedelta
+from typing import List, Sequence
 from uuid import uuid4
 
-from sqlalchemy import func
+from sqlalchemy import (
+    Date,
+    Select,
+    String,
+    and_,
+    case,
+    cast,
+    func,
+    insert,
+    literal,
+    null,
+    or_,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.inventory import InventoryRecord
 from app.models.inbound_history import InboundHistory
 from app.models.outbound_history import OutboundHistory
 from app.models.user import User
+from app.services.config_service import (
+    ensure_item_types,
+    ensure_units,
+    get_config_value,
+    invalidate_config_cache,
+)
+from app.services.image_service import derivative_url
+from app.services.io_rollup_service import (
+    get_io_totals,
+    get_io_totals_async,
+    record_io_inbound,
+    record_io_outbound,
+)
+from app.services.stock_summary_service import (
+    get_stock_total,
+    get_stock_totals,
+    record_stock_inbound,
+    record_stock_outbound,
+)
+from app.services.version_service import INVENTORY_VERSION, bump_version, commit_and_bump
+
+DEFAULT_EXPIRY_WARNING_DAYS = 7
+
+
+def default_warning_days(db: Session) -> int:
+    """全局 EXPIRY_WARNING_DAYS，配置缺失或非法时为 7"""
+    try:
+        return int(get_config_value(db, "EXPIRY_WARNING_DAYS"))
+    except (TypeError, ValueError):
+        return DEFAULT_EXPIRY_WARNING_DAYS
+
+
+def _warn_from(expiry: date, warning_days: int | None, default_days: int) -> date:
+    return expiry - timedelta(days=default_days if warning_days is None else warning_days)
+
+
 def add_inbound(
     db: Session,
     user_id: int,
@@ -23,15 +80,17 @@ def add_inbound(
     location: str = "",
     photo: str = "",
 ) -> str:
+    expiry = date.fromisoformat(expiry_date)
     record = InventoryRecord(
         id=str(uuid4()),
         item_type=item_type,
         unit=unit or "",
         quantity=quantity,
-        expiry_date=date.fromisoformat(expiry_date),
+        expiry_date=expiry,
         inbound_date=date.fromisoformat(inbound_date),
         production_date=production_date or "",
         expiry_warning_days=expiry_warning_days,
+        warn_from=_warn_from(expiry, expiry_warning_days, default_warning_days(db)),
         tag=tag or "",
         location=location or "",
         photo=photo or "",
@@ -52,89 +111,501 @@ def add_inbound(
         photo=photo or "",
     )
     db.add(history)
-    db.commit()
+    record_stock_inbound(db, item_type, unit, quantity, record.expiry_date)
+    record_io_inbound(db, record.inbound_date, item_type, quantity)
+    bump_version(db, INVENTORY_VERSION)
+    commit_and_bump(db)
     return record.id
 
 
-def outbound_by_id(
-    db: Session, user_id: int, record_id: str, quantity: int, outbound_date: str
-) -> tuple[bool, str]:
-    """Outbound by specific record ID. Returns (success, message)."""
-    record = db.query(InventoryRecord).filter(InventoryRecord.id == record_id).first()
-    if not record:
-        return False, "该物品记录不存在"
-    if record.quantity < quantity:
-        return False, f"库存不足，当前库存: {record.quantity}"
-    remaining = quantity
+def add_inbound_batch(db: Session, user_id: int, items: List[dict]) -> List[str]:
+    """批量入库：items 的键与 add_inbound 参数相同，调用方须先校验全部条目。库存记录与入库历史批量插入，
+    库存汇总与 config 的 ITEM_TYPES/UNIT 每批只更新一次，全部在同一事务内提交。返回各条记录 id"""
+    records = []
+    histories = []
+    summary: dict[tuple[str, str], list] = {}
+    daily: dict[tuple[date, str], int] = {}
+    default_days = default_warning_days(db)
+    for item in items:
+        record_id = str(uuid4())
+        expiry = date.fromisoformat(item["expiry_date"])
+        common = {
+            "item_type": item["item_type"],
+            "unit": item.get("unit") or "",
+            "quantity": item["quantity"],
+            "expiry_date": expiry,
+            "inbound_date": date.fromisoformat(item["inbound_date"]),
+            "production_date": item.get("production_date") or "",
+            "tag": item.get("tag") or "",
+            "location": item.get("location") or "",
+            "photo": item.get("photo") or "",
+        }
+        warning_days = item.get("expiry_warning_days")
+        records.append({
+            **common,
+            "id": record_id,
+            "expiry_warning_days": warning_days,
+            "warn_from": _warn_from(expiry, warning_days, default_days),
+        })
+        histories.append({**common, "user_id": user_id, "inventory_record_id": record_id})
+        agg = summary.setdefault((common["item_type"], common["unit"]), [0, 0, expiry])
+        agg[0] += common["quantity"]
+        agg[1] += 1
+        agg[2] = min(agg[2], expiry)
+        day_key = (common["inbound_date"], common["item_type"])
+        daily[day_key] = daily.get(day_key, 0) + common["quantity"]
+    if not records:
+        return []
+    # 汇总行按主键顺序 upsert：并发的批量入库以相同顺序锁定汇总行，不会互相等待而死锁；
+    # 死锁、锁等待超时等可重试错误整批重试（次数与出库相同），仍失败时抛出
+    for attempt in range(OUTBOUND_MAX_ATTEMPTS):
+        try:
+            db.execute(insert(InventoryRecord), records)
+            db.execute(insert(InboundHistory), histories)
+            for (item_type, unit), (quantity, lots, earliest) in sorted(summary.items()):
+                record_stock_inbound(db, item_type, unit, quantity, earliest, lots=lots)
+            for (day, item_type), quantity in sorted(daily.items()):
+                record_io_inbound(db, day, item_type, quantity)
+            config_changed = ensure_item_types(
+                db, [r["item_type"] for r in records], commit=False
+            )
+            config_changed = (
+                ensure_units(db, [r["unit"] for r in records], commit=False) or config_changed
+            )
+            bump_version(db, INVENTORY_VERSION)
+            commit_and_bump(db)
+            break
+        except OperationalError:
+            db.rollback()
+            if attempt == OUTBOUND_MAX_ATTEMPTS - 1:
+                raise
+            time.sleep(OUTBOUND_RETRY_BACKOFF * (2 ** attempt))
+    if config_changed:
+        invalidate_config_cache()
+    return [r["id"] for r in records]
+
+
+def _decrement_lot(db: Session, record_id: str, quantity: int) -> int | None:
+    """从批次原子扣减 quantity：单条 UPDATE ... WHERE quantity >= n，并发扣减同一批次不会超扣或丢失；
+    扣完的批次随即删除。数量不足（含已被删除）时返回 None，否则返回删除的批次数（0 或 1）"""
+    updated = (
+        db.query(InventoryRecord)
+        .filter(InventoryRecord.id == record_id, InventoryRecord.quantity >= quantity)
+        .update(
+            {InventoryRecord.quantity: InventoryRecord.quantity - quantity},
+            synchronize_session=False,
+        )
+    )
+    if not updated:
+        return None
+    return (
+        db.query(InventoryRecord)
+        .filter(InventoryRecord.id == record_id, InventoryRecord.quantity <= 0)
+        .delete(synchronize_session=False)
+    )
+
+
+def _outbound_record(
+    db: Session, user_id: int, record: InventoryRecord, quantity: int, outbound_date: date
+) -> bool:
+    """从指定批次原子扣减 quantity，写出库历史并更新汇总，不提交。
+    数量不足（含已被删除）时返回 False 且不写入任何数据"""
+    record_id = record.id
+    item_type = record.item_type
     unit = record.unit or ""
     tag = record.tag or ""
     location = record.location or ""
-    if record.quantity <= remaining:
-        remaining -= record.quantity
-        db.delete(record)
+    lots_removed = _decrement_lot(db, record_id, quantity)
+    if lots_removed is None:
+        return False
+    # 会话中的对象已与表中数据不一致
+    if lots_removed:
+        db.expunge(record)
     else:
-        record.quantity -= remaining
-        remaining = 0
+        db.expire(record)
+    record_stock_outbound(
+        db, item_type, unit, quantity, lots_removed, refresh_expiry=bool(lots_removed)
+    )
+    record_io_outbound(db, outbound_date, item_type, quantity)
     history = OutboundHistory(
         user_id=user_id,
-        item_type=record.item_type,
+        item_type=item_type,
         quantity=quantity,
-        outbound_date=date.fromisoformat(outbound_date),
+        outbound_date=outbound_date,
         unit=unit,
         tag=tag,
         location=location,
     )
     db.add(history)
-    db.commit()
-    return True, "出库成功"
+    return True
 
 
-def outbound_fifo(
-    db: Session, user_id: int, item_type: str, quantity: int, outbound_date: str
-) -> tuple[bool, str]:
-    """FIFO outbound. Returns (success, message)."""
-    records = (
-        db.query(InventoryRecord)
-        .filter(InventoryRecord.item_type == item_type)
-        .order_by(InventoryRecord.inbound_date.asc(), InventoryRecord.create_time.asc())
-        .all()
-    )
-    if not records:
-        return False, "该物品库存为空"
-    total = sum(r.quantity for r in records)
-    if total < quantity:
-        return False, f"库存不足，当前库存: {total}"
+FIFO_CHUNK_SIZE = 16
+FIFO_CHUNK_MAX = 512
+
+
+def _iter_fifo_lots(db: Session, item_type: str):
+    """按 FIFO 顺序（入库日期、创建时间）分块惰性读取批次，调用方停止迭代即不再查询。
+    块大小逐次翻倍，读取量与实际消耗的批次数成正比，而不是与该物品的全部批次数成正比。
+    迭代期间不得 flush（扣减与删除在迭代结束后才写库），否则偏移会错位"""
+    offset = 0
+    chunk = FIFO_CHUNK_SIZE
+    while True:
+        with db.no_autoflush:
+            lots = (
+                db.query(InventoryRecord)
+                .filter(InventoryRecord.item_type == item_type)
+                .order_by(
+                    InventoryRecord.inbound_date.asc(),
+                    InventoryRecord.create_time.asc(),
+                    InventoryRecord.id.asc(),
+                )
+                .offset(offset)
+                .limit(chunk)
+                .all()
+            )
+        yield from lots
+        if len(lots) < chunk:
+            return
+        offset += len(lots)
+        chunk = min(chunk * 2, FIFO_CHUNK_MAX)
+
+
+def _outbound_fifo_lots(
+    db: Session, user_id: int, item_type: str, quantity: int, outbound_date: date
+) -> int:
+    """按 FIFO 从该物品的批次扣减 quantity，写出库历史并更新汇总，不提交。
+    先按读取到的数量分配，迭代结束后逐批次条件扣减（与按 id 出库同一 _decrement_lot）：
+    读取之后被其他请求扣减的批次扣减失败，不会覆盖对方的扣减。
+    返回未能满足的数量；非 0 时调用方应回滚"""
+    plan: list[tuple[InventoryRecord, int]] = []
     remaining = quantity
     first_unit = ""
     first_tag = ""
     first_location = ""
-    for r in records:
+    for r in _iter_fifo_lots(db, item_type):
         if not first_unit and r.unit:
             first_unit = r.unit
         if not first_tag and r.tag:
             first_tag = r.tag
         if not first_location and r.location:
             first_location = r.location
+        take = min(r.quantity, remaining)
+        plan.append((r, take))
+        remaining -= take
         if remaining <= 0:
             break
-        if r.quantity <= remaining:
-            remaining -= r.quantity
-            db.delete(r)
+    if remaining > 0:
+        return remaining
+    # 按单位累计本次出库数量与删除的批次数，用于更新汇总表
+    consumed_by_unit: dict[str, list[int]] = {}
+    for i, (r, take) in enumerate(plan):
+        unit = r.unit or ""
+        lots_removed = _decrement_lot(db, r.id, take)
+        if lots_removed is None:
+            return sum(t for _, t in plan[i:])
+        # 会话中的对象已与表中数据不一致
+        if lots_removed:
+            db.expunge(r)
         else:
-            r.quantity -= remaining
-            remaining = 0
+            db.expire(r)
+        consumed = consumed_by_unit.setdefault(unit, [0, 0])
+        consumed[0] += take
+        consumed[1] += lots_removed
+    for unit, (consumed_qty, lots_removed) in sorted(consumed_by_unit.items()):
+        record_stock_outbound(
+            db, item_type, unit, consumed_qty, lots_removed, refresh_expiry=bool(lots_removed)
+        )
+    record_io_outbound(db, outbound_date, item_type, quantity)
     history = OutboundHistory(
         user_id=user_id,
         item_type=item_type,
         quantity=quantity,
-        outbound_date=date.fromisoformat(outbound_date),
+        outbound_date=outbound_date,
         unit=first_unit or "",
         tag=first_tag or "",
         location=first_location or "",
     )
     db.add(history)
-    db.commit()
-    return True, "出库成功"
+    return 0
+
+
+# 死锁、锁等待超时、SQLite database is locked 等可重试错误的最大尝试次数
+OUTBOUND_MAX_ATTEMPTS = 3
+OUTBOUND_RETRY_BACKOFF = 0.05
+
+
+def outbound_by_id(
+    db: Session, user_id: int, record_id: str, quantity: int, outbound_date: str
+) -> tuple[bool, str]:
+    """Outbound by specific record ID. Returns (success, message)."""
+    day = date.fromisoformat(outbound_date)
+    for attempt in range(OUTBOUND_MAX_ATTEMPTS):
+        try:
+            record = db.query(InventoryRecord).filter(InventoryRecord.id == record_id).first()
+            if not record:
+                return False, "该物品记录不存在"
+            if record.quantity < quantity:
+                return False, f"库存不足，当前库存: {record.quantity}"
+            if not _outbound_record(db, user_id, record, quantity, day):
+                # 读取之后被其他请求扣减
+                db.rollback()
+                current = (
+                    db.query(InventoryRecord.quantity)
+                    .filter(InventoryRecord.id == record_id)
+                    .scalar()
+                )
+                if current is None:
+                    return False, "该物品记录不存在"
+                return False, f"库存不足，当前库存: {current}"
+            bump_version(db, INVENTORY_VERSION)
+            commit_and_bump(db)
+            return True, "出库成功"
+        except OperationalError:
+            db.rollback()
+            if attempt < OUTBOUND_MAX_ATTEMPTS - 1:
+                time.sleep(OUTBOUND_RETRY_BACKOFF * (2 ** attempt))
+    return False, "系统繁忙，请稍后重试"
+
+
+def outbound_fifo(
+    db: Session, user_id: int, item_type: str, quantity: int, outbound_date: str
+) -> tuple[bool, str]:
+    """FIFO outbound. Returns (success, message)."""
+    day = date.fromisoformat(outbound_date)
+    for attempt in range(OUTBOUND_MAX_ATTEMPTS):
+        try:
+            # 库存是否充足由汇总表单行查询判断，不足时不必加载批次
+            total = get_stock_total(db, item_type)
+            if total <= 0:
+                return False, "该物品库存为空"
+            if total < quantity:
+                return False, f"库存不足，当前库存: {total}"
+            if _outbound_fifo_lots(db, user_id, item_type, quantity, day) == 0:
+                bump_version(db, INVENTORY_VERSION)
+                commit_and_bump(db)
+                return True, "出库成功"
+            # 批次在读取之后被其他请求扣减（或汇总表与批次不一致，需执行
+            # scripts/rebuild_stock_summary.py），放弃本次扣减后重新读取
+            db.rollback()
+        except OperationalError:
+            db.rollback()
+        if attempt < OUTBOUND_MAX_ATTEMPTS - 1:
+            time.sleep(OUTBOUND_RETRY_BACKOFF * (2 ** attempt))
+    return False, "系统繁忙，请稍后重试"
+
+
+def _outbound_batch_once(
+    db: Session, user_id: int, lines: List[dict], dates: dict[int, date], errors: List[dict]
+) -> tuple[bool, List[dict]]:
+    """outbound_batch 的一次尝试：校验库存并扣减，成功时提交。errors 为日期校验的错误，
+    日期有误的行（不在 dates 中）不再校验库存。返回 (是否可重试, errors)；errors 为空表示已提交，
+    可重试表示校验之后批次被其他请求扣减（已回滚）"""
+    errors = list(errors)
+    record_ids = {line["id"] for line in lines if line.get("id")}
+    records = {}
+    if record_ids:
+        records = {
+            r.id: r
+            for r in db.query(InventoryRecord).filter(InventoryRecord.id.in_(record_ids)).all()
+        }
+    # 需求量：按批次、按物品类型（含指定批次的出库量）汇总
+    demand_by_record: dict[str, int] = {}
+    demand_by_type: dict[str, int] = {}
+    for index, line in enumerate(lines):
+        if index not in dates:
+            continue
+        if line.get("id"):
+            record = records.get(line["id"])
+            if record is None:
+                errors.append({"index": index, "message": "该物品记录不存在"})
+                continue
+            demand_by_record[record.id] = demand_by_record.get(record.id, 0) + line["quantity"]
+            item_type = record.item_type
+        else:
+            item_type = line["item_type"]
+        demand_by_type[item_type] = demand_by_type.get(item_type, 0) + line["quantity"]
+    totals = get_stock_totals(db, list(demand_by_type))
+    for index, line in enumerate(lines):
+        if index not in dates:
+            continue
+        record = records.get(line["id"]) if line.get("id") else None
+        if record is not None and demand_by_record[record.id] > record.quantity:
+            errors.append({"index": index, "message": f"库存不足，当前库存: {record.quantity}"})
+        elif not line.get("id"):
+            total = totals.get(line["item_type"], 0)
+            if total <= 0:
+                errors.append({"index": index, "message": "该物品库存为空"})
+            elif demand_by_type[line["item_type"]] > total:
+                errors.append({"index": index, "message": f"库存不足，当前库存: {total}"})
+    if errors:
+        errors.sort(key=lambda e: e["index"])
+        return False, errors
+
+    # 按 (物品类型, 单位, 批次 id) 的固定顺序扣减，与请求中行的顺序无关：
+    # 并发的多行出库以相同顺序锁定批次与汇总行，不会互相等待对方已锁的行而死锁。
+    # 同一物品类型先扣减指定批次，再按 FIFO 分配该类型的其余行
+    def apply_order(index: int) -> tuple:
+        line = lines[index]
+        if line.get("id"):
+            record = records[line["id"]]
+            return (record.item_type, 0, record.unit or "", record.id, index)
+        return (line["item_type"], 1, "", "", index)
+
+    for index in sorted(range(len(lines)), key=apply_order):
+        line = lines[index]
+        if line.get("id"):
+            applied = _outbound_record(
+                db, user_id, records[line["id"]], line["quantity"], dates[index]
+            )
+        else:
+            applied = _outbound_fifo_lots(
+                db, user_id, line["item_type"], line["quantity"], dates[index]
+            ) == 0
+        if not applied:
+            # 校验之后被其他请求扣减
+            db.rollback()
+            return True, [{"index": index, "message": "库存不足，请稍后重试"}]
+        db.flush()  # 同一物品类型的后续行需看到本行的扣减
+    bump_version(db, INVENTORY_VERSION)
+    commit_and_bump(db)
+    return False, []
+
+
+def outbound_batch(db: Session, user_id: int, lines: List[dict]) -> tuple[bool, List[dict]]:
+    """多行出库，全部成功才提交。lines 每行含 item_type、quantity、outbound_date，
+    指定 id 时按批次出库，否则按 FIFO。每个物品类型只查一次库存（汇总表），
+    指定批次一次性按 id 批量读取。死锁等可重试错误及校验之后被并发扣减时整批重试，
+    最多 OUTBOUND_MAX_ATTEMPTS 次。返回 (success, errors)，errors 为 [{"index", "message"}]，
+    按行在请求中的顺序排列"""
+    errors: List[dict] = []
+    dates: dict[int, date] = {}
+    for index, line in enumerate(lines):
+        try:
+            dates[index] = date.fromisoformat(line["outbound_date"])
+        except ValueError:
+            errors.append({"index": index, "message": "日期格式错误，请使用 YYYY-MM-DD"})
+
+    date_errors = errors
+    for attempt in range(OUTBOUND_MAX_ATTEMPTS):
+        try:
+            retry, errors = _outbound_batch_once(db, user_id, lines, dates, date_errors)
+            if not retry:
+                return not errors, errors
+        except OperationalError:
+            db.rollback()
+            errors = [
+                {"index": index, "message": "系统繁忙，请稍后重试"} for index in range(len(lines))
+            ]
+        if attempt < OUTBOUND_MAX_ATTEMPTS - 1:
+            time.sleep(OUTBOUND_RETRY_BACKOFF * (2 ** attempt))
+    return False, errors
+
+
+# 分页接口 limit 的上限（路由以 Query(ge=1, le=MAX_PAGE_SIZE) 校验）
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values: list) -> str:
+    """把排序键的值编码为不透明游标"""
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values],
+        ensure_ascii=False,
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _parse_cursor_value(column, value):
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> list:
+    """解析游标并按排序列的类型还原取值，格式错误时抛出 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [_parse_cursor_value(c, v) for c, v in zip(columns, values)]
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise ValueError("无效的分页游标") from e
+
+
+def _after_cursor(columns: Sequence, values: list, descending: bool):
+    """(c1, c2, ...) 严格排在游标之后的条件：c1 > v1 OR (c1 = v1 AND c2 > v2) ..."""
+    clauses = []
+    for i, (col, value) in enumerate(zip(columns, values)):
+        step = col < value if descending else col > value
+        clauses.append(and_(*[c == v for c, v in zip(columns[:i], values[:i])], step))
+    return or_(*clauses)
+
+
+def _paginate_query(
+    query,
+    columns: Sequence,
+    page: int,
+    limit: int | None,
+    cursor: str | None,
+    descending: bool,
+):
+    """为 Query 或 select() 加上排序、游标/偏移与 limit + 1（用于判断是否还有下一页）"""
+    order = [c.desc() if descending else c.asc() for c in columns]
+    query = query.order_by(*order)
+    if limit is None:
+        return query
+    if cursor:
+        query = query.filter(_after_cursor(columns, decode_cursor(cursor, columns), descending))
+    else:
+        query = query.offset((max(page, 1) - 1) * limit)
+    return query.limit(limit + 1)
+
+
+def _paginate_result(rows, columns: Sequence, limit: int | None):
+    if limit is None:
+        return rows, False, None
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    next_cursor = None
+    if has_more and items:
+        last = items[-1]
+        values = [getattr(last, c.key) for c in columns]
+        if all(v is not None for v in values):
+            next_cursor = encode_cursor(values)
+    return items, has_more, next_cursor
+
+
+def paginate(
+    query,
+    columns: Sequence,
+    page: int = 1,
+    limit: int | None = None,
+    cursor: str | None = None,
+    descending: bool = False,
+):
+    """按 columns 排序分页（最后一列须唯一）。传 cursor 时按游标定位，否则按 page 偏移；
+    limit 为空时不分页。返回 (rows, has_more, next_cursor)"""
+    rows = _paginate_query(query, columns, page, limit, cursor, descending).all()
+    return _paginate_result(rows, columns, limit)
+
+
+async def paginate_async(
+    db: AsyncSession,
+    stmt,
+    columns: Sequence,
+    page: int = 1,
+    limit: int | None = None,
+    cursor: str | None = None,
+    descending: bool = False,
+):
+    """paginate 的异步版本，stmt 为 select() 语句"""
+    stmt = _paginate_query(stmt, columns, page, limit, cursor, descending)
+    rows = (await db.execute(stmt)).all()
+    return _paginate_result(rows, columns, limit)
 
 
 def get_all_records(db: Session) -> List[InventoryRecord]:
@@ -145,60 +616,301 @@ def get_all_records(db: Session) -> List[InventoryRecord]:
     )
 
 
-def get_overview(db: Session) -> List[dict]:
-    """每条记录含物品、标签、位置、数量、入库时间、到期日期、照片、到期告警，按 daysRemaining 排序。仅当记录设置了 expiry_warning_days 时才告警。包含所有记录，不因无到期日期而过滤"""
-    records = get_all_records(db)
-    today = date.today()
-    today_ts = datetime.combine(today, datetime.min.time())
-    result = []
-    for r in records:
-        if r.expiry_date:
-            expiry_ts = datetime.combine(r.expiry_date, datetime.min.time())
-            inbound_ts = (
-                datetime.combine(r.inbound_date, datetime.min.time())
-                if r.inbound_date
-                else expiry_ts
-            )
-            days_remaining = (expiry_ts - today_ts).days
-            total_shelf_days = max(
-                1, (expiry_ts - inbound_ts).days if inbound_ts else 365
-            )
-            progress_percent = max(
-                0, min(100, (days_remaining / total_shelf_days) * 100)
-            )
-            expiry_warning = (
-                r.expiry_warning_days is not None
-                and days_remaining <= r.expiry_warning_days
+# 总览排序键 -> 排序列（最后一列为主键，保证游标唯一）。daysRemaining 即按 expiry_date 升序
+# 列表接口只查询用到的列，返回轻量 Row，不构造 ORM 对象、不进入会话标识映射
+OVERVIEW_COLUMNS = (
+    InventoryRecord.id,
+    InventoryRecord.item_type,
+    InventoryRecord.unit,
+    InventoryRecord.tag,
+    InventoryRecord.location,
+    InventoryRecord.quantity,
+    InventoryRecord.inbound_date,
+    InventoryRecord.expiry_date,
+    InventoryRecord.expiry_warning_days,
+    InventoryRecord.photo,
+)
+OUTBOUND_LIST_COLUMNS = (
+    InventoryRecord.id,
+    InventoryRecord.item_type,
+    InventoryRecord.tag,
+    InventoryRecord.quantity,
+    InventoryRecord.unit,
+    InventoryRecord.location,
+)
+
+OVERVIEW_SORTS = {
+    "daysRemaining": (InventoryRecord.expiry_date, InventoryRecord.id),
+    "inboundDate": (InventoryRecord.inbound_date, InventoryRecord.id),
+    "itemType": (InventoryRecord.item_type, InventoryRecord.expiry_date, InventoryRecord.id),
+}
+
+
+def _expiry_minus_days(db: Session, days: int):
+    """SQL 表达式：expiry_date 减去 days 天"""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(InventoryRecord.expiry_date, f"-{int(days)} days")
+    return func.date_sub(InventoryRecord.expiry_date, text(f"INTERVAL {int(days)} DAY"))
+
+
+def refresh_default_warn_from(db: Session, default_days: int) -> int:
+    """全局 EXPIRY_WARNING_DAYS 修改后，重算未单独设置告警天数的批次的 warn_from，不提交。返回更新行数"""
+    return (
+        db.query(InventoryRecord)
+        .filter(InventoryRecord.expiry_warning_days.is_(None))
+        .update(
+            {InventoryRecord.warn_from: _expiry_minus_days(db, default_days)},
+            synchronize_session=False,
+        )
+    )
+
+
+def rebuild_warn_from(db: Session) -> int:
+    """按当前配置全量重算 warn_from 并提交，返回更新行数。
+    用于 EXPIRY_WARNING_DAYS 被绕过 set_config_value 修改（直接改表、脚本）之后"""
+    invalidate_config_cache()
+    count = refresh_default_warn_from(db, default_warning_days(db))
+    custom_days = [
+        days
+        for (days,) in db.query(InventoryRecord.expiry_warning_days)
+        .filter(InventoryRecord.expiry_warning_days.isnot(None))
+        .distinct()
+    ]
+    for days in custom_days:
+        count += (
+            db.query(InventoryRecord)
+            .filter(InventoryRecord.expiry_warning_days == days)
+            .update(
+                {InventoryRecord.warn_from: _expiry_minus_days(db, days)},
+                synchronize_session=False,
             )
-            expiry_date_str = r.expiry_date.isoformat()
-        else:
-            days_remaining = 999999
-            progress_percent = 100
-            expiry_warning = False
-            expiry_date_str = ""
-        result.append(
-            {
+        )
+    db.commit()
+    return count
+
+
+def verify_warn_from(db: Session) -> List[dict]:
+    """对比持久化的 warn_from 与按当前配置计算的值，返回不一致的批次列表"""
+    invalidate_config_cache()
+    default_days = default_warning_days(db)
+    rows = db.query(
+        InventoryRecord.id,
+        InventoryRecord.item_type,
+        InventoryRecord.expiry_date,
+        InventoryRecord.expiry_warning_days,
+        InventoryRecord.warn_from,
+    ).yield_per(1000)
+    mismatches = []
+    for r in rows:
+        expected = (
+            _warn_from(r.expiry_date, r.expiry_warning_days, default_days)
+            if r.expiry_date
+            else None
+        )
+        if expected != r.warn_from:
+            mismatches.append({
                 "id": r.id,
                 "itemType": r.item_type,
-                "unit": r.unit or "",
-                "tag": r.tag or "",
-                "location": r.location or "",
-                "quantity": r.quantity,
-                "inboundDate": r.inbound_date.isoformat() if r.inbound_date else "",
-                "expiryDate": expiry_date_str,
-                "daysRemaining": days_remaining,
-                "progressPercent": round(progress_percent, 2),
-                "expiryWarning": expiry_warning,
-                "photo": r.photo or "",
-            }
+                "expected": expected.isoformat() if expected else None,
+                "actual": r.warn_from.isoformat() if r.warn_from else None,
+            })
+    return mismatches
+
+
+def _overview_item(r, today_ts: datetime) -> dict:
+    """r 为 OVERVIEW_COLUMNS 查询出的行"""
+    if r.expiry_date:
+        expiry_ts = datetime.combine(r.expiry_date, datetime.min.time())
+        inbound_ts = (
+            datetime.combine(r.inbound_date, datetime.min.time())
+            if r.inbound_date
+            else expiry_ts
         )
-    result.sort(key=lambda x: x["daysRemaining"])
-    return result
+        days_remaining = (expiry_ts - today_ts).days
+        total_shelf_days = max(
+            1, (expiry_ts - inbound_ts).days if inbound_ts else 365
+        )
+        progress_percent = max(
+            0, min(100, (days_remaining / total_shelf_days) * 100)
+        )
+        expiry_warning = (
+            r.expiry_warning_days is not None
+            and days_remaining <= r.expiry_warning_days
+        )
+        expiry_date_str = r.expiry_date.isoformat()
+    else:
+        days_remaining = 999999
+        progress_percent = 100
+        expiry_warning = False
+        expiry_date_str = ""
+    return {
+        "id": r.id,
+        "itemType": r.item_type,
+        "unit": r.unit or "",
+        "tag": r.tag or "",
+        "location": r.location or "",
+        "quantity": r.quantity,
+        "inboundDate": r.inbound_date.isoformat() if r.inbound_date else "",
+        "expiryDate": expiry_date_str,
+        "daysRemaining": days_remaining,
+        "progressPercent": round(progress_percent, 2),
+        "expiryWarning": expiry_warning,
+        "photo": r.photo or "",
+        "thumb": derivative_url(r.photo),
+    }
+
+
+def _overview_filters(
+    item_type: str | None,
+    location: str | None,
+    tag: str | None,
+    warning_only: bool,
+    expiring_within_days: int | None,
+    today: date,
+) -> list:
+    filters = []
+    if item_type:
+        filters.append(InventoryRecord.item_type == item_type)
+    if location:
+        filters.append(InventoryRecord.location == location)
+    if tag:
+        filters.append(InventoryRecord.tag == tag)
+    if expiring_within_days is not None:
+        filters.append(InventoryRecord.expiry_date <= today + timedelta(days=expiring_within_days))
+    if warning_only:
+        filters.append(InventoryRecord.expiry_warning_days.isnot(None))
+        filters.append(InventoryRecord.warn_from <= today)
+    return filters
+
+
+def get_overview(
+    db: Session,
+    item_type: str | None = None,
+    location: str | None = None,
+    tag: str | None = None,
+    warning_only: bool = False,
+    expiring_within_days: int | None = None,
+    sort: str = "daysRemaining",
+    page: int = 1,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> tuple[List[dict], bool, str | None]:
+    """每条记录含物品、标签、位置、数量、入库时间、到期日期、照片、到期告警，默认按 daysRemaining 排序。仅当记录设置了 expiry_warning_days 时才告警
+    （全局 EXPIRY_WARNING_DAYS 下的告警见 get_expiring）。
+    筛选、排序、分页均在 SQL 中完成；limit 为空时返回全部。返回 (items, has_more, next_cursor)"""
+    today = date.today()
+    query = db.query(*OVERVIEW_COLUMNS).filter(
+        *_overview_filters(item_type, location, tag, warning_only, expiring_within_days, today)
+    )
+    columns = OVERVIEW_SORTS.get(sort, OVERVIEW_SORTS["daysRemaining"])
+    records, has_more, next_cursor = paginate(query, columns, page, limit, cursor)
+    today_ts = datetime.combine(today, datetime.min.time())
+    return [_overview_item(r, today_ts) for r in records], has_more, next_cursor
+
+
+async def get_overview_async(
+    db: AsyncSession,
+    item_type: str | None = None,
+    location: str | None = None,
+    tag: str | None = None,
+    warning_only: bool = False,
+    expiring_within_days: int | None = None,
+    sort: str = "daysRemaining",
+    page: int = 1,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> tuple[List[dict], bool, str | None]:
+    """get_overview 的异步版本"""
+    today = date.today()
+    stmt = select(*OVERVIEW_COLUMNS).where(
+        *_overview_filters(item_type, location, tag, warning_only, expiring_within_days, today)
+    )
+    columns = OVERVIEW_SORTS.get(sort, OVERVIEW_SORTS["daysRemaining"])
+    records, has_more, next_cursor = await paginate_async(db, stmt, columns, page, limit, cursor)
+    today_ts = datetime.combine(today, datetime.min.time())
+    return [_overview_item(r, today_ts) for r in records], has_more, next_cursor
+
+
+def _add_months(day: date, months: int) -> date:
+    """day 之后 months 个自然月的同一天（月末对齐，如 1-31 加 1 个月为 2-28/29）"""
+    month = day.month - 1 + months
+    year = day.year + month // 12
+    month = month % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def get_expiring(
+    db: Session,
+    day: date | None = None,
+    new_only: bool = False,
+    item_type: str | None = None,
+    page: int = 1,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> tuple[List[dict], bool, str | None]:
+    """已进入到期告警的批次（warn_from <= day；new_only 时仅 day 当天新进入告警的），按到期日排序。
+    按持久化的 warn_from 走索引筛选，不逐行计算剩余天数。返回 (items, has_more, next_cursor)"""
+    day = day or date.today()
+    query = db.query(*OVERVIEW_COLUMNS, InventoryRecord.warn_from)
+    if new_only:
+        query = query.filter(InventoryRecord.warn_from == day)
+    else:
+        query = query.filter(InventoryRecord.warn_from <= day)
+    if item_type:
+        query = query.filter(InventoryRecord.item_type == item_type)
+    rows, has_more, next_cursor = paginate(
+        query, OVERVIEW_SORTS["daysRemaining"], page, limit, cursor
+    )
+    day_ts = datetime.combine(day, datetime.min.time())
+    items = []
+    for r in rows:
+        item = _overview_item(r, day_ts)
+        item["expiryWarning"] = True
+        item["warnFrom"] = r.warn_from.isoformat()
+        items.append(item)
+    return items, has_more, next_cursor
+
+
+def get_expiry_buckets(db: Session, day: date | None = None, item_type: str | None = None) -> dict:
+    """按 config EXPIRY 的月数窗口（如 1/3/6 个月）统计即将到期的批次数与数量，另统计已过期的。
+    窗口为累计口径（3 个月内包含 1 个月内），一条聚合查询在 SQL 中完成"""
+    day = day or date.today()
+    windows = []
+    for months in get_config_value(db, "EXPIRY") or []:
+        try:
+            windows.append(int(months))
+        except (TypeError, ValueError):
+            continue
+    windows = sorted({m for m in windows if m > 0})
+    ends = [_add_months(day, m) for m in windows]
+    expiry = InventoryRecord.expiry_date
+    quantity = InventoryRecord.quantity
+    conditions = [expiry < day] + [expiry.between(day, end) for end in ends]
+    columns = []
+    for condition in conditions:
+        columns.append(func.count(case((condition, 1))))
+        columns.append(func.sum(case((condition, quantity), else_=0)))
+    query = db.query(*columns).filter(expiry <= max(ends, default=day))
+    if item_type:
+        query = query.filter(InventoryRecord.item_type == item_type)
+    row = query.one()
+    counts = [(row[i] or 0, row[i + 1] or 0) for i in range(0, len(row), 2)]
+    return {
+        "expired": {"lots": counts[0][0], "quantity": counts[0][1]},
+        "windows": [
+            {"months": m, "until": end.isoformat(), "lots": lots, "quantity": qty}
+            for m, end, (lots, qty) in zip(windows, ends, counts[1:])
+        ],
+    }
 
 
 def get_outbound_list(db: Session) -> List[dict]:
     """物品+标签+数量+单位+位置"""
-    records = get_all_records(db)
+    records = (
+        db.query(*OUTBOUND_LIST_COLUMNS)
+        .order_by(InventoryRecord.inbound_date.asc(), InventoryRecord.create_time.asc())
+        .all()
+    )
     return [
         {
             "id": r.id,
@@ -212,29 +924,10 @@ def get_outbound_list(db: Session) -> List[dict]:
     ]
 
 
-def get_io_stats_by_range(db: Session, start_date: str, end_date: str) -> List[dict]:
-    """按时间范围聚合出入库统计，按物品类型"""
-    start = date.fromisoformat(start_date)
-    end = date.fromisoformat(end_date)
-    inbound_rows = (
-        db.query(InboundHistory.item_type, func.sum(InboundHistory.quantity).label("total"))
-        .filter(InboundHistory.inbound_date >= start, InboundHistory.inbound_date <= end)
-        .group_by(InboundHistory.item_type)
-        .all()
-    )
-    outbound_rows = (
-        db.query(OutboundHistory.item_type, func.sum(OutboundHistory.quantity).label("total"))
-        .filter(OutboundHistory.outbound_date >= start, OutboundHistory.outbound_date <= end)
-        .group_by(OutboundHistory.item_type)
-        .all()
-    )
-    inbound_by_type = {r.item_type: int(r.total or 0) for r in inbound_rows}
-    outbound_by_type = {r.item_type: int(r.total or 0) for r in outbound_rows}
-    all_types = set(inbound_by_type.keys()) | set(outbound_by_type.keys())
+def _io_stats_items(totals: dict[str, tuple[int, int]]) -> List[dict]:
     result = []
-    for item_type in sorted(all_types):
-        inbound_qty = inbound_by_type.get(item_type, 0)
-        outbound_qty = outbound_by_type.get(item_type, 0)
+    for item_type in sorted(totals):
+        inbound_qty, outbound_qty = totals[item_type]
         result.append({
             "itemType": item_type,
             "inboundQty": inbound_qty,
@@ -244,83 +937,224 @@ def get_io_stats_by_range(db: Session, start_date: str, end_date: str) -> List[d
     return result
 
 
-def get_io_details(
-    db: Session, item_type: str, start_date: str, end_date: str, detail_type: str
+def get_io_stats_by_range(db: Session, start_date: str, end_date: str) -> List[dict]:
+    """按时间范围聚合出入库统计，按物品类型。读取 daily_io_rollup，每个物品每天一行"""
+    start = date.fromisoformat(start_date)
+    end = date.fromisoformat(end_date)
+    return _io_stats_items(get_io_totals(db, start, end))
+
+
+async def get_io_stats_by_range_async(
+    db: AsyncSession, start_date: str, end_date: str
 ) -> List[dict]:
-    """按物品、时间范围获取入库/出库明细。detail_type: inbound|outbound|both"""
+    """get_io_stats_by_range 的异步版本"""
     start = date.fromisoformat(start_date)
     end = date.fromisoformat(end_date)
-    result = []
+    return _io_stats_items(await get_io_totals_async(db, start, end))
+
+
+def _io_details_parts(
+    item_type: str | None, start: date, end: date, detail_type: str
+) -> list[tuple[str, Select]]:
+    """入库/出库明细各自的查询（含操作人姓名），item_type 为空时不按物品过滤。返回 [(type, select)]。
+    列：type, date, item_type, quantity, unit, location, expiry_date, tag, user_name, create_time, id"""
+    parts = []
     if detail_type in ("inbound", "both"):
-        rows = (
-            db.query(InboundHistory, User.name)
-            .join(User, InboundHistory.user_id == User.id)
-            .filter(
-                InboundHistory.item_type == item_type,
-                InboundHistory.inbound_date >= start,
-                InboundHistory.inbound_date <= end,
+        q = (
+            select(
+                literal("inbound", String).label("type"),
+                InboundHistory.inbound_date.label("date"),
+                InboundHistory.item_type.label("item_type"),
+                InboundHistory.quantity.label("quantity"),
+                InboundHistory.unit.label("unit"),
+                InboundHistory.location.label("location"),
+                InboundHistory.expiry_date.label("expiry_date"),
+                InboundHistory.tag.label("tag"),
+                User.name.label("user_name"),
+                InboundHistory.create_time.label("create_time"),
+                InboundHistory.id.label("id"),
             )
-            .order_by(InboundHistory.create_time.desc())
-            .all()
+            .join(User, InboundHistory.user_id == User.id)
+            .where(InboundHistory.inbound_date >= start, InboundHistory.inbound_date <= end)
         )
-        for r, user_name in rows:
-            result.append({
-                "type": "inbound",
-                "date": r.inbound_date.isoformat(),
-                "quantity": r.quantity,
-                "unit": r.unit or "",
-                "location": r.location or "",
-                "expiryDate": r.expiry_date.isoformat() if r.expiry_date else "",
-                "tag": r.tag or "",
-                "itemType": r.item_type,
-                "userName": user_name or "",
-                "createTime": r.create_time.isoformat() if r.create_time else "",
-            })
+        if item_type:
+            q = q.where(InboundHistory.item_type == item_type)
+        parts.append(("inbound", q))
     if detail_type in ("outbound", "both"):
-        rows = (
-            db.query(OutboundHistory, User.name)
-            .join(User, OutboundHistory.user_id == User.id)
-            .filter(
-                OutboundHistory.item_type == item_type,
-                OutboundHistory.outbound_date >= start,
-                OutboundHistory.outbound_date <= end,
+        q = (
+            select(
+                literal("outbound", String).label("type"),
+                OutboundHistory.outbound_date.label("date"),
+                OutboundHistory.item_type.label("item_type"),
+                OutboundHistory.quantity.label("quantity"),
+                OutboundHistory.unit.label("unit"),
+                OutboundHistory.location.label("location"),
+                cast(null(), Date).label("expiry_date"),
+                OutboundHistory.tag.label("tag"),
+                User.name.label("user_name"),
+                OutboundHistory.create_time.label("create_time"),
+                OutboundHistory.id.label("id"),
             )
-            .order_by( OutboundHistory.create_time.desc())
-            .all()
+            .join(User, OutboundHistory.user_id == User.id)
+            .where(OutboundHistory.outbound_date >= start, OutboundHistory.outbound_date <= end)
         )
-        for r, user_name in rows:
-            result.append({
-                "type": "outbound",
-                "date": r.outbound_date.isoformat(),
-                "quantity": r.quantity,
-                "unit": r.unit or "",
-                "location": r.location or "",
-                "expiryDate": "",
-                "tag": r.tag or "",
-                "itemType": r.item_type,
-                "userName": user_name or "",
-                "createTime": r.create_time.isoformat() if r.create_time else "",
-            })
+        if item_type:
+            q = q.where(OutboundHistory.item_type == item_type)
+        parts.append(("outbound", q))
+    return parts
+
+
+def _io_details_subquery(item_type: str | None, start: date, end: date, detail_type: str):
+    """入库/出库明细的 UNION ALL 子查询，列同 _io_details_parts"""
+    parts = [q for _, q in _io_details_parts(item_type, start, end, detail_type)]
+    return (union_all(*parts) if len(parts) > 1 else parts[0]).subquery("io")
+
+
+def _io_details_columns(columns, detail_type: str) -> tuple:
+    """明细排序键（倒序），columns 为子查询的 .c 或语句的 selected_columns。both：按日期、同一天出库在前，(type, id) 保证唯一；
+    只查入库或出库时与分页前一致，按创建时间倒序"""
     if detail_type == "both":
-        result.sort(key=lambda x: (x["date"], x["type"]), reverse=True)
-    return result
+        return (columns.date, columns.type, columns.create_time, columns.id)
+    return (columns.create_time, columns.id)
+
+
+def _io_details_page(
+    db: Session,
+    item_type: str | None,
+    start: date,
+    end: date,
+    page: int,
+    limit: int,
+    cursor: str | None,
+):
+    """detail_type=both 的一页明细：每个分支先按游标过滤、按同一排序键排序并只取本页可能用到的
+    行数（游标翻页 limit + 1，偏移翻页再加上偏移量），UNION ALL 合并后再排序、取一页。
+    各分支不必把时间范围内的全部明细交给外层排序；游标条件已在分支内，合并后不再重复。
+    返回 (rows, has_more, next_cursor)"""
+    parts = _io_details_parts(item_type, start, end, "both")
+    values = None
+    if cursor:
+        c = parts[0][1].selected_columns
+        values = decode_cursor(cursor, (c.date, c.type, c.create_time, c.id))
+    fetch = limit + 1 if cursor else (max(page, 1) - 1) * limit + limit + 1
+    branches = []
+    for type_name, q in parts:
+        c = q.selected_columns
+        if values is not None:
+            day, cursor_type, create_time, row_id = values
+            # 分支内 type 为常量，(date, type, create_time, id) 的游标条件化简为本分支的列
+            if type_name < cursor_type:
+                q = q.where(c.date <= day)
+            elif type_name > cursor_type:
+                q = q.where(c.date < day)
+            else:
+                q = q.where(
+                    or_(
+                        c.date < day,
+                        and_(
+                            c.date == day,
+                            _after_cursor(
+                                (c.create_time, c.id), [create_time, row_id], descending=True
+                            ),
+                        ),
+                    )
+                )
+        q = q.order_by(c.date.desc(), c.create_time.desc(), c.id.desc()).limit(fetch)
+        # 包一层子查询：SQLite 不允许 UNION ALL 的成员直接带 ORDER BY / LIMIT
+        branches.append(select(q.subquery()))
+    stmt = union_all(*branches)
+    columns = _io_details_columns(stmt.selected_columns, "both")
+    stmt = stmt.order_by(*[c.desc() for c in columns]).limit(limit + 1)
+    if not cursor:
+        stmt = stmt.offset((max(page, 1) - 1) * limit)
+    return _paginate_result(db.execute(stmt).all(), columns, limit)
+
+
+def io_details_select(item_type: str | None, start: date, end: date, detail_type: str):
+    """按 _io_details_columns 倒序的明细查询，供导出流式读取"""
+    sub = _io_details_subquery(item_type, start, end, detail_type)
+    return select(sub).order_by(*[c.desc() for c in _io_details_columns(sub.c, detail_type)])
+
+
+def get_io_details(
+    db: Session,
+    item_type: str,
+    start_date: str,
+    end_date: str,
+    detail_type: str,
+    page: int = 1,
+    limit: int | None = None,
+    cursor: str | None = None,
+    with_total: bool = False,
+) -> tuple[List[dict], bool, str | None, int | None]:
+    """按物品、时间范围获取入库/出库明细。detail_type: inbound|outbound|both。
+    both 按日期倒序、同一天出库在前；只查入库或出库时按创建时间倒序。
+    单条（UNION ALL）查询，在数据库中排序、分页，both 时游标与 limit 下推到各分支；
+    limit 为空时返回全部（兼容旧版小程序）。
+    with_total 为真时另查总条数。返回 (items, has_more, next_cursor, total)"""
+    start = date.fromisoformat(start_date)
+    end = date.fromisoformat(end_date)
+    if detail_type == "both" and limit is not None:
+        rows, has_more, next_cursor = _io_details_page(
+            db, item_type, start, end, page, limit, cursor
+        )
+    else:
+        sub = _io_details_subquery(item_type, start, end, detail_type)
+        columns = _io_details_columns(sub.c, detail_type)
+        rows, has_more, next_cursor = paginate(
+            db.query(sub), columns, page, limit, cursor, descending=True
+        )
+    total = None
+    if with_total:
+        sub = _io_details_subquery(item_type, start, end, detail_type)
+        total = db.query(func.count()).select_from(sub).scalar()
+    items = [
+        {
+            "type": r.type,
+            "date": r.date.isoformat(),
+            "quantity": r.quantity,
+            "unit": r.unit or "",
+            "location": r.location or "",
+            "expiryDate": r.expiry_date.isoformat() if r.expiry_date else "",
+            "tag": r.tag or "",
+            "itemType": r.item_type,
+            "userName": r.user_name or "",
+            "createTime": r.create_time.isoformat() if r.create_time else "",
+        }
+        for r in rows
+    ]
+    return items, has_more, next_cursor, total
+
+
+def _history_page(query, model, page: int, limit: int, cursor: str | None):
+    """按 (create_time, id) 倒序分页：传 cursor 时走索引定位（keyset），否则兼容旧的 page 偏移。
+    返回 (rows, has_more, next_cursor)"""
+    return paginate(
+        query, (model.create_time, model.id), page, limit, cursor, descending=True
+    )
 
 
 def get_my_inbound(
-    db: Session, user_id: int, page: int = 1, limit: int = 5
-) -> tuple[List[dict], bool]:
-    """当前用户的入库记录，分页。返回 (items, has_more)"""
-    offset = (page - 1) * limit
-    rows = (
-        db.query(InboundHistory)
-        .filter(InboundHistory.user_id == user_id)
-        .order_by(InboundHistory.create_time.desc())
-        .offset(offset)
-        .limit(limit + 1)
-        .all()
+    db: Session, user_id: int, page: int = 1, limit: int = 5, cursor: str | None = None
+) -> tuple[List[dict], bool, str | None]:
+    """当前用户的入库记录，分页。传 cursor 时按游标翻页。返回 (items, has_more, next_cursor)"""
+    items, has_more, next_cursor = _history_page(
+        db.query(
+            InboundHistory.id,
+            InboundHistory.item_type,
+            InboundHistory.quantity,
+            InboundHistory.unit,
+            InboundHistory.inbound_date,
+            InboundHistory.expiry_date,
+            InboundHistory.location,
+            InboundHistory.tag,
+            InboundHistory.create_time,
+        ).filter(InboundHistory.user_id == user_id),
+        InboundHistory,
+        page,
+        limit,
+        cursor,
     )
-    has_more = len(rows) > limit
-    items = rows[:limit]
     return [
         {
             "id": r.id,
@@ -334,24 +1168,29 @@ def get_my_inbound(
             "createTime": r.create_time.isoformat() if r.create_time else "",
         }
         for r in items
-    ], has_more
+    ], has_more, next_cursor
 
 
 def get_my_outbound(
-    db: Session, user_id: int, page: int = 1, limit: int = 5
-) -> tuple[List[dict], bool]:
-    """当前用户的出库记录，分页。返回 (items, has_more)"""
-    offset = (page - 1) * limit
-    rows = (
-        db.query(OutboundHistory)
-        .filter(OutboundHistory.user_id == user_id)
-        .order_by(OutboundHistory.create_time.desc())
-        .offset(offset)
-        .limit(limit + 1)
-        .all()
+    db: Session, user_id: int, page: int = 1, limit: int = 5, cursor: str | None = None
+) -> tuple[List[dict], bool, str | None]:
+    """当前用户的出库记录，分页。传 cursor 时按游标翻页。返回 (items, has_more, next_cursor)"""
+    items, has_more, next_cursor = _history_page(
+        db.query(
+            OutboundHistory.id,
+            OutboundHistory.item_type,
+            OutboundHistory.quantity,
+            OutboundHistory.unit,
+            OutboundHistory.outbound_date,
+            OutboundHistory.location,
+            OutboundHistory.tag,
+            OutboundHistory.create_time,
+        ).filter(OutboundHistory.user_id == user_id),
+        OutboundHistory,
+        page,
+        limit,
+        cursor,
     )
-    has_more = len(rows) > limit
-    items = rows[:limit]
     return [
         {
             "id": r.id,
@@ -364,4 +1203,4 @@ def get_my_outbound(
             "createTime": r.create_time.isoformat() if r.create_time else "",
         }
         for r in items
-    ], has_more
+    ], has_more, next_cursor
@@ -0,0 +1,126 @@
+"""每日出入库汇总表 daily_io_rollup 的增量维护、区间统计与重建/校验
+
+调用方负责 commit：增量函数只在当前事务内写入，与出入库历史一同提交。
+"""
+from datetime import date
+from typing import List
+
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import upsert
+from app.models.daily_io_rollup import DailyIoRollup
+from app.models.inbound_history import InboundHistory
+from app.models.outbound_history import OutboundHistory
+
+
+def _record_io(db: Session, day: date, item_type: str, inbound: int, outbound: int) -> None:
+    # 单条 upsert：当天某物品的首次出入库在并发事务中同时发生时不会主键冲突
+    upsert(
+        db,
+        DailyIoRollup,
+        {"day": day, "item_type": item_type, "inbound_qty": inbound, "outbound_qty": outbound},
+        {
+            "inbound_qty": DailyIoRollup.inbound_qty + inbound,
+            "outbound_qty": DailyIoRollup.outbound_qty + outbound,
+        },
+    )
+
+
+def record_io_inbound(db: Session, day: date, item_type: str, quantity: int) -> None:
+    """入库日 day 的 item_type 入库数量累加 quantity"""
+    _record_io(db, day, item_type, quantity, 0)
+
+
+def record_io_outbound(db: Session, day: date, item_type: str, quantity: int) -> None:
+    """出库日 day 的 item_type 出库数量累加 quantity"""
+    _record_io(db, day, item_type, 0, quantity)
+
+
+def _io_totals_statement(start: date, end: date):
+    return (
+        select(
+            DailyIoRollup.item_type,
+            func.sum(DailyIoRollup.inbound_qty).label("inbound"),
+            func.sum(DailyIoRollup.outbound_qty).label("outbound"),
+        )
+        .where(DailyIoRollup.day >= start, DailyIoRollup.day <= end)
+        .group_by(DailyIoRollup.item_type)
+    )
+
+
+def _io_totals(rows) -> dict[str, tuple[int, int]]:
+    return {r.item_type: (int(r.inbound or 0), int(r.outbound or 0)) for r in rows}
+
+
+def get_io_totals(db: Session, start: date, end: date) -> dict[str, tuple[int, int]]:
+    """[start, end] 内按物品类型合计 {item_type: (入库数量, 出库数量)}"""
+    return _io_totals(db.execute(_io_totals_statement(start, end)).all())
+
+
+async def get_io_totals_async(
+    db: AsyncSession, start: date, end: date
+) -> dict[str, tuple[int, int]]:
+    """get_io_totals 的异步版本"""
+    return _io_totals((await db.execute(_io_totals_statement(start, end))).all())
+
+
+def _aggregate_history(db: Session) -> dict:
+    movements = union_all(
+        select(
+            InboundHistory.inbound_date.label("day"),
+            InboundHistory.item_type.label("item_type"),
+            InboundHistory.quantity.label("inbound_qty"),
+            literal(0).label("outbound_qty"),
+        ),
+        select(
+            OutboundHistory.outbound_date.label("day"),
+            OutboundHistory.item_type.label("item_type"),
+            literal(0).label("inbound_qty"),
+            OutboundHistory.quantity.label("outbound_qty"),
+        ),
+    ).subquery()
+    rows = db.execute(
+        select(
+            movements.c.day,
+            movements.c.item_type,
+            func.sum(movements.c.inbound_qty).label("inbound"),
+            func.sum(movements.c.outbound_qty).label("outbound"),
+        ).group_by(movements.c.day, movements.c.item_type)
+    ).all()
+    return {(r.day, r.item_type): (int(r.inbound or 0), int(r.outbound or 0)) for r in rows}
+
+
+def rebuild_io_rollup(db: Session) -> int:
+    """按出入库历史全量重建汇总表，返回写入行数"""
+    expected = _aggregate_history(db)
+    db.query(DailyIoRollup).delete(synchronize_session=False)
+    db.bulk_insert_mappings(
+        DailyIoRollup,
+        [
+            {"day": day, "item_type": item_type, "inbound_qty": inbound, "outbound_qty": outbound}
+            for (day, item_type), (inbound, outbound) in expected.items()
+        ],
+    )
+    db.commit()
+    return len(expected)
+
+
+def verify_io_rollup(db: Session) -> List[dict]:
+    """对比汇总表与出入库历史的实时聚合，返回不一致的 (day, item_type) 列表"""
+    expected = _aggregate_history(db)
+    actual = {
+        (r.day, r.item_type): (r.inbound_qty, r.outbound_qty)
+        for r in db.query(DailyIoRollup).all()
+    }
+    mismatches = []
+    for key in sorted(set(expected) | set(actual)):
+        if expected.get(key, (0, 0)) != actual.get(key, (0, 0)):
+            mismatches.append({
+                "day": key[0].isoformat(),
+                "itemType": key[1],
+                "expected": expected.get(key),
+                "actual": actual.get(key),
+            })
+    return mismatches
@@ -0,0 +1,276 @@
+"""库存汇总表 stock_summary 的增量维护、查询与重建/校验
+
+调用方负责 commit：增量函数只在当前事务内写入，与库存记录的变更一同提交。
+"""
+from datetime import date
+from typing import List
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.database import upsert
+from app.models.inventory import InventoryRecord
+from app.models.stock_summary import StockSummary
+from app.services.config_service import get_config_value, get_config_version
+from app.services.version_service import INVENTORY_VERSION, get_version
+
+# 低库存结果按 (库存版本号, 阈值, 物品类型列表) 缓存：任一库存写入后版本号变化即不再命中；
+# 阈值取自配置缓存（本进程修改立即生效，绕过版本号的直接改表最迟 CONFIG_CACHE_TTL 后生效），
+# 配置值变化即换用新的键。TTL 只用于回收旧条目
+LOW_STOCK_CACHE_TTL = 3600.0
+_low_stock_cache = TTLCache(maxsize=8, ttl=LOW_STOCK_CACHE_TTL)
+
+
+def _summary_filter(item_type: str, unit: str):
+    return (StockSummary.item_type == item_type, StockSummary.unit == (unit or ""))
+
+
+def record_stock_inbound(
+    db: Session, item_type: str, unit: str, quantity: int, expiry_date: date, lots: int = 1
+) -> None:
+    """入库 lots 个批次（合计 quantity，最早到期 expiry_date）：总数量、批次数累加，最早到期日取较小值。
+    新 (item_type, unit) 与已有行的累加在同一条 upsert 中完成，并发首次入库不会主键冲突"""
+    upsert(
+        db,
+        StockSummary,
+        {
+            "item_type": item_type,
+            "unit": unit or "",
+            "total_quantity": quantity,
+            "lot_count": lots,
+            "earliest_expiry": expiry_date,
+        },
+        {
+            "total_quantity": StockSummary.total_quantity + quantity,
+            "lot_count": StockSummary.lot_count + lots,
+            "earliest_expiry": case(
+                (
+                    (StockSummary.earliest_expiry.is_(None))
+                    | (StockSummary.earliest_expiry > expiry_date),
+                    expiry_date,
+                ),
+                else_=StockSummary.earliest_expiry,
+            ),
+        },
+    )
+
+
+def record_stock_outbound(
+    db: Session,
+    item_type: str,
+    unit: str,
+    quantity: int,
+    lots_removed: int = 0,
+    refresh_expiry: bool = False,
+) -> None:
+    """出库：总数量 -quantity，批次数 -lots_removed。
+    refresh_expiry 为真时（删除了批次）按剩余库存重算最早到期日；批次清空则删除汇总行。"""
+    db.query(StockSummary).filter(*_summary_filter(item_type, unit)).update(
+        {
+            StockSummary.total_quantity: StockSummary.total_quantity - quantity,
+            StockSummary.lot_count: StockSummary.lot_count - lots_removed,
+        },
+        synchronize_session=False,
+    )
+    if not lots_removed:
+        return
+    db.query(StockSummary).filter(
+        *_summary_filter(item_type, unit), StockSummary.lot_count <= 0
+    ).delete(synchronize_session=False)
+    if refresh_expiry:
+        db.flush()  # 让已删除的批次不参与 MIN 计算
+        earliest = (
+            db.query(func.min(InventoryRecord.expiry_date))
+            .filter(
+                InventoryRecord.item_type == item_type,
+                func.coalesce(InventoryRecord.unit, "") == (unit or ""),
+            )
+            .scalar_subquery()
+        )
+        db.query(StockSummary).filter(*_summary_filter(item_type, unit)).update(
+            {StockSummary.earliest_expiry: earliest}, synchronize_session=False
+        )
+
+
+def get_stock_total(db: Session, item_type: str) -> int:
+    """某物品类型的当前库存总量（各单位合计）"""
+    total = (
+        db.query(func.sum(StockSummary.total_quantity))
+        .filter(StockSummary.item_type == item_type)
+        .scalar()
+    )
+    return int(total or 0)
+
+
+def get_stock_totals(db: Session, item_types: List[str]) -> dict[str, int]:
+    """多个物品类型的当前库存总量，一次查询"""
+    if not item_types:
+        return {}
+    rows = (
+        db.query(StockSummary.item_type, func.sum(StockSummary.total_quantity).label("total"))
+        .filter(StockSummary.item_type.in_(item_types))
+        .group_by(StockSummary.item_type)
+        .all()
+    )
+    return {r.item_type: int(r.total or 0) for r in rows}
+
+
+def get_stock_summary(db: Session) -> List[dict]:
+    """按物品类型、单位返回库存汇总"""
+    rows = (
+        db.query(StockSummary)
+        .order_by(StockSummary.item_type.asc(), StockSummary.unit.asc())
+        .all()
+    )
+    return [
+        {
+            "itemType": r.item_type,
+            "unit": r.unit or "",
+            "totalQuantity": r.total_quantity,
+            "lotCount": r.lot_count,
+            "earliestExpiry": r.earliest_expiry.isoformat() if r.earliest_expiry else "",
+        }
+        for r in rows
+    ]
+
+
+def _low_stock_thresholds(db: Session) -> tuple[int, dict[str, int]]:
+    """(全局 LOW_STOCK_THRESHOLD, 物品类型 -> 单独阈值)，非法值忽略"""
+    try:
+        default = int(get_config_value(db, "LOW_STOCK_THRESHOLD"))
+    except (TypeError, ValueError):
+        default = 0
+    overrides = {}
+    for item_type, value in (get_config_value(db, "LOW_STOCK_THRESHOLDS") or {}).items():
+        try:
+            overrides[item_type] = int(value)
+        except (TypeError, ValueError):
+            continue
+    return default, overrides
+
+
+def _query_low_stock(
+    db: Session, default: int, overrides: dict[str, int], item_types: tuple[str, ...]
+) -> List[dict]:
+    threshold = case(overrides, value=StockSummary.item_type, else_=default) if overrides else default
+    rows = (
+        db.query(
+            StockSummary.item_type,
+            StockSummary.unit,
+            StockSummary.total_quantity,
+            StockSummary.earliest_expiry,
+        )
+        .filter(StockSummary.total_quantity < threshold)
+        .order_by(StockSummary.item_type.asc(), StockSummary.unit.asc())
+        .all()
+    )
+    items = [
+        {
+            "itemType": r.item_type,
+            "unit": r.unit or "",
+            "totalQuantity": r.total_quantity,
+            "threshold": overrides.get(r.item_type, default),
+            "earliestExpiry": r.earliest_expiry.isoformat() if r.earliest_expiry else "",
+        }
+        for r in rows
+    ]
+    # 已全部出库的物品没有汇总行，按库存为 0 列出（阈值为 0 的除外）
+    stocked = {
+        r.item_type
+        for r in db.query(StockSummary.item_type).distinct()
+    }
+    for item_type in item_types:
+        limit = overrides.get(item_type, default)
+        if item_type not in stocked and limit > 0:
+            items.append({
+                "itemType": item_type,
+                "unit": "",
+                "totalQuantity": 0,
+                "threshold": limit,
+                "earliestExpiry": "",
+            })
+    items.sort(key=lambda i: (i["itemType"], i["unit"]))
+    return items
+
+
+def get_low_stock(db: Session) -> tuple[List[dict], tuple]:
+    """库存低于阈值的 (物品类型, 单位)：阈值取 config LOW_STOCK_THRESHOLDS 中该物品的单独设置，
+    否则为 LOW_STOCK_THRESHOLD。比较在 SQL 中基于 stock_summary 完成。
+    返回 (items, 缓存键)，库存版本号与阈值、物品类型均未变时直接返回缓存结果；
+    缓存键可用于生成 ETag"""
+    # 其他进程经接口修改过配置（版本号变化）时使配置缓存失效，阈值立即生效
+    get_config_version(db)
+    default, overrides = _low_stock_thresholds(db)
+    item_types = tuple(get_config_value(db, "ITEM_TYPES") or [])
+    key = (
+        get_version(db, INVENTORY_VERSION),
+        default,
+        tuple(sorted(overrides.items())),
+        item_types,
+    )
+    items = _low_stock_cache.get(key)
+    if items is None:
+        items = _query_low_stock(db, default, overrides, item_types)
+        _low_stock_cache.set(key, items)
+    return items, key
+
+
+def get_low_stock_cache_stats() -> dict:
+    return _low_stock_cache.stats()
+
+
+def _aggregate_inventory(db: Session) -> dict:
+    unit_col = func.coalesce(InventoryRecord.unit, "")
+    rows = (
+        db.query(
+            InventoryRecord.item_type,
+            unit_col.label("unit"),
+            func.sum(InventoryRecord.quantity).label("total"),
+            func.count().label("lots"),
+            func.min(InventoryRecord.expiry_date).label("earliest"),
+        )
+        .group_by(InventoryRecord.item_type, unit_col)
+        .all()
+    )
+    return {
+        (r.item_type, r.unit): (int(r.total or 0), int(r.lots), r.earliest)
+        for r in rows
+    }
+
+
+def rebuild_stock_summary(db: Session) -> int:
+    """按 inventory_records 全量重建汇总表，返回写入行数"""
+    expected = _aggregate_inventory(db)
+    db.query(StockSummary).delete(synchronize_session=False)
+    for (item_type, unit), (total, lots, earliest) in expected.items():
+        db.add(
+            StockSummary(
+                item_type=item_type,
+                unit=unit,
+                total_quantity=total,
+                lot_count=lots,
+                earliest_expiry=earliest,
+            )
+        )
+    db.commit()
+    return len(expected)
+
+
+def verify_stock_summary(db: Session) -> List[dict]:
+    """对比汇总表与 inventory_records 的实时聚合，返回不一致的 (item_type, unit) 列表"""
+    expected = _aggregate_inventory(db)
+    actual = {
+        (r.item_type, r.unit or ""): (r.total_quantity, r.lot_count, r.earliest_expiry)
+        for r in db.query(StockSummary).all()
+    }
+    mismatches = []
+    for key in sorted(set(expected) | set(actual)):
+        if expected.get(key) != actual.get(key):
+            mismatches.append({
+                "itemType": key[0],
+                "unit": key[1],
+                "expected": expected.get(key),
+                "actual": actual.get(key),
+            })
+    return mismatches
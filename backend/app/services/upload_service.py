@@ -0,0 +1,198 @@
+"""图片上传落盘：边接收 multipart 请求体边分块写入同目录临时文件，校验文件头与大小，完成后原子重命名
+
+请求体不经 Starlette 表单解析（整体接收并缓存到临时文件后才交给路由），而是由 receive_image
+流式解析：Content-Length 超限时不读取请求体直接拒绝，未声明长度时按已接收字节数中止；
+文件内容只写一次磁盘。解析在事件循环中进行，写盘在线程池中按块进行；
+内存中只保留一个分块，其他请求看不到写了一半的文件。
+"""
+import os
+import tempfile
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from python_multipart import MultipartParser
+from python_multipart.exceptions import FormParserError
+from python_multipart.multipart import parse_options_header
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from app.config import settings
+
+# 文件头识别所需的字节数（WEBP 需要前 12 字节）
+IMAGE_HEAD_BYTES = 12
+# 请求体中除文件内容外的余量：分隔符、各部分头部及少量普通字段
+MULTIPART_OVERHEAD = 16 * 1024
+
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def detect_image_type(head: bytes) -> str | None:
+    """按文件头识别图片格式，返回扩展名；不是支持的格式返回 None"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return ".gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+def _too_large(limit: int) -> str:
+    return f"图片大小不能超过 {limit / 1024 / 1024:g}MB"
+
+
+class ImageWriter:
+    """分块写入 uploads/<日期>/ 下的临时文件：凑够文件头即校验格式，累计超过上限即报错；
+    commit 后原子重命名为 <uuid><扩展名>（扩展名以文件头为准）。同步方法，由线程池调用"""
+
+    def __init__(self, max_bytes: int | None = None):
+        self.limit = settings.upload_max_bytes if max_bytes is None else max_bytes
+        self.size = 0
+        self._ext: str | None = None
+        self._head = b""
+        self._date_dir = datetime.now().strftime("%Y%m%d")
+        self._dir_path = Path(settings.upload_dir) / self._date_dir
+        self._dir_path.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=self._dir_path, prefix=".upload-", suffix=".tmp")
+        self._out = os.fdopen(fd, "wb")
+
+    def _check_head(self) -> None:
+        self._ext = detect_image_type(self._head)
+        if self._ext is None:
+            raise ValueError("仅支持 JPG、PNG、GIF、WEBP 格式的图片")
+        self._out.write(self._head)
+        self._head = b""
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.limit:
+            raise ValueError(_too_large(self.limit))
+        if self._ext is None:
+            self._head += chunk
+            if len(self._head) >= IMAGE_HEAD_BYTES:
+                self._check_head()
+            return
+        self._out.write(chunk)
+
+    def commit(self) -> str:
+        """返回 URL 路径。格式不支持时抛出 ValueError，调用方应再调用 abort"""
+        if self._ext is None:
+            self._check_head()
+        self._out.close()
+        # mkstemp 创建的文件权限为 0600，改为与直接写文件时一致（便于 nginx 等直接读取）
+        os.chmod(self._tmp_path, 0o666 & ~_UMASK)
+        filename = f"{uuid.uuid4().hex}{self._ext}"
+        os.replace(self._tmp_path, self._dir_path / filename)
+        return f"/uploads/{self._date_dir}/{filename}"
+
+    def abort(self) -> None:
+        self._out.close()
+        try:
+            os.unlink(self._tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+class _FilePart:
+    """MultipartParser 回调：按各部分的 Content-Disposition 找出字段 field 的第一个文件，收集其数据"""
+
+    def __init__(self, field: str):
+        self.field = field.encode()
+        self.found = False
+        self._active = False
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._data: list[bytes] = []
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self) -> None:
+        self._disposition = b""
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        self._active = (
+            not self.found and options.get(b"name") == self.field and b"filename" in options
+        )
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._active:
+            self._data.append(data[start:end])
+
+    def on_part_end(self) -> None:
+        if self._active:
+            self.found = True
+            self._active = False
+
+    def take(self) -> bytes:
+        """取出目前收集到的文件数据"""
+        data = b"".join(self._data)
+        self._data.clear()
+        return data
+
+
+def _multipart_boundary(content_type: str) -> bytes:
+    media_type, params = parse_options_header(content_type)
+    if media_type != b"multipart/form-data" or b"boundary" not in params:
+        raise ValueError("请以 multipart/form-data 上传图片")
+    return params[b"boundary"]
+
+
+async def receive_image(request: Request, field: str = "file", max_bytes: int | None = None) -> str:
+    """从请求体流式解析并保存字段 field 的第一个文件，返回 URL 路径。
+    格式不支持、超过 max_bytes、缺少该字段或请求体格式错误时抛出 ValueError，临时文件随即删除"""
+    limit = settings.upload_max_bytes if max_bytes is None else max_bytes
+    body_limit = limit + MULTIPART_OVERHEAD
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > body_limit:
+        raise ValueError(_too_large(limit))
+    part = _FilePart(field)
+    boundary = _multipart_boundary(request.headers.get("content-type", ""))
+    parser = MultipartParser(boundary, part.callbacks())
+    writer = await run_in_threadpool(ImageWriter, limit)
+    try:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > body_limit:
+                raise ValueError(_too_large(limit))
+            parser.write(chunk)
+            data = part.take()
+            if data:
+                await run_in_threadpool(writer.write, data)
+        parser.finalize()
+        if not part.found:
+            raise ValueError("请选择要上传的图片")
+        return await run_in_threadpool(writer.commit)
+    except FormParserError as e:
+        writer.abort()
+        raise ValueError("上传数据格式错误") from e
+    except BaseException:
+        writer.abort()
+        raise
@@ -0,0 +1,64 @@
+"""数据版本号的递增与读取
+
+版本号存于 data_versions 表（多 worker 共享），读取方据此生成 ETag，版本未变时无需查询和序列化数据。
+写入方在提交前调用 bump_version 登记，再以 commit_and_bump 提交数据并以独立的短事务递增版本号：
+版本行不会在写事务期间一直被锁住，出入库提交不会都排在同一热点行之后；
+代价是提交与递增之间的极短窗口内读到的 ETag 可能仍是旧值，下一次请求即会更新。
+SQLite 写事务本就独占整个库、没有行锁热点，版本号随数据在同一事务内递增，省去一次提交。
+"""
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import upsert
+from app.models.data_version import DataVersion
+
+logger = logging.getLogger(__name__)
+
+INVENTORY_VERSION = "inventory"
+CONFIG_VERSION = "config"
+
+# session.info 中待递增的版本名集合
+_PENDING_KEY = "pending_versions"
+
+
+def bump_version(db: Session, name: str) -> None:
+    """登记版本号 +1，由 commit_and_bump 在数据提交后递增。不提交"""
+    db.info.setdefault(_PENDING_KEY, set()).add(name)
+
+
+def _increment(db: Session, names) -> None:
+    for name in sorted(names):
+        upsert(db, DataVersion, {"name": name, "version": 1}, {"version": DataVersion.version + 1})
+
+
+def commit_and_bump(db: Session) -> None:
+    """提交当前事务，再以同一会话的独立短事务递增已登记的版本号。
+    会话在两次提交之间归还连接，不会同时占用两个连接。SQLite 在同一事务内递增后一次提交"""
+    if db.get_bind().dialect.name == "sqlite":
+        _increment(db, db.info.pop(_PENDING_KEY, ()))
+        db.commit()
+        return
+    db.commit()
+    names = db.info.pop(_PENDING_KEY, None)
+    if not names:
+        return
+    try:
+        _increment(db, names)
+        db.commit()
+    except Exception:
+        # 数据已提交，不因版本号递增失败而报错；ETag 在下一次写入时更新
+        db.rollback()
+        logger.exception("递增数据版本号失败: %s", sorted(names))
+
+
+def get_version(db: Session, name: str) -> int:
+    version = db.query(DataVersion.version).filter(DataVersion.name == name).scalar()
+    return int(version or 0)
+
+
+async def get_version_async(db: AsyncSession, name: str) -> int:
+    version = await db.scalar(select(DataVersion.version).where(DataVersion.name == name))
+    return int(version or 0)
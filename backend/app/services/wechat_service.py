@@ -1,37 +1,105 @@
-"""微信小程序服务：code2session、getPhoneNumber"""
+"""微信小程序服务：code2session、getPhoneNumber
+
+异步接口（*_async）使用进程内共享的 httpx.AsyncClient（连接池 + keep-alive），
+access_token 刷新为单飞：并发请求只触发一次刷新，其余等待结果。
+同步接口保留给脚本等非异步调用方，使用共享的 httpx.Client。
+"""
+import asyncio
+import threading
 import time
+from contextlib import contextmanager
+
 import httpx
 
 from app.config import settings
+from app.core.metrics import Counter, Histogram
 
-WECHAT_BASE = "https://api.weixin.qq.com"
-WECHAT_CODE2SESSION = f"{WECHAT_BASE}/sns/jscode2session"
-WECHAT_TOKEN = f"{WECHAT_BASE}/cgi-bin/token"
-WECHAT_GET_PHONE = f"{WECHAT_BASE}/wxa/business/getuserphonenumber"
+WECHAT_TIMEOUT = 10.0
+WECHAT_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60.0)
 
 # access_token 缓存（有效期 7200 秒，提前 5 分钟刷新）
 _token_cache: tuple[str, float] | None = None
+_token_lock = threading.Lock()
+_async_token_lock: asyncio.Lock | None = None
 
+_client: httpx.Client | None = None
+_async_client: httpx.AsyncClient | None = None
 
-def _get_access_token() -> tuple[str | None, str | None]:
-    """获取 access_token（用于调用 getPhoneNumber 等接口）"""
-    global _token_cache
+WECHAT_LATENCY = Histogram("wechat_request_duration_seconds", "微信接口调用耗时", ("api",))
+# kind：exception 为网络/解析异常，errcode 为接口返回错误
+WECHAT_ERRORS = Counter("wechat_request_errors_total", "微信接口调用失败次数", ("api", "kind"))
+
+
+@contextmanager
+def _timed(api: str):
+    """统计一次微信接口调用（请求与解析响应）的耗时，异常计入 exception 错误"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        WECHAT_ERRORS.inc(api, "exception")
+        raise
+    finally:
+        WECHAT_LATENCY.observe(time.perf_counter() - start, api)
+
+
+def _checked(api: str, result: tuple[str | None, str | None]) -> tuple[str | None, str | None]:
+    if result[1]:
+        WECHAT_ERRORS.inc(api, "errcode")
+    return result
+
+
+def _url(path: str) -> str:
+    return f"{settings.wechat_api_base.rstrip('/')}{path}"
+
+
+def _get_client() -> httpx.Client:
+    global _client
+    if _client is None:
+        _client = httpx.Client(timeout=WECHAT_TIMEOUT, limits=WECHAT_LIMITS)
+    return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(timeout=WECHAT_TIMEOUT, limits=WECHAT_LIMITS)
+    return _async_client
+
+
+async def aclose_clients() -> None:
+    """应用关闭时释放连接池"""
+    global _client, _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def _credentials_error() -> str | None:
     if not settings.wechat_appid or not settings.wechat_secret:
-        return None, "未配置 WECHAT_APPID 或 WECHAT_SECRET"
-    now = time.time()
-    if _token_cache and _token_cache[1] > now:
-        return _token_cache[0], None
-    params = {
+        return "未配置 WECHAT_APPID 或 WECHAT_SECRET"
+    return None
+
+
+def _cached_token() -> str | None:
+    if _token_cache and _token_cache[1] > time.time():
+        return _token_cache[0]
+    return None
+
+
+def _token_params() -> dict:
+    return {
         "grant_type": "client_credential",
         "appid": settings.wechat_appid,
         "secret": settings.wechat_secret,
     }
-    try:
-        with httpx.Client(timeout=10.0) as client:
-            resp = client.get(WECHAT_TOKEN, params=params)
-            data = resp.json()
-    except Exception as e:
-        return None, str(e)
+
+
+def _store_token(data: dict, now: float) -> tuple[str | None, str | None]:
+    global _token_cache
     errcode = data.get("errcode")
     if errcode:
         return None, data.get("errmsg", "获取 access_token 失败")
@@ -41,6 +109,78 @@ def _get_access_token() -> tuple[str | None, str | None]:
     return token, None
 
 
+def _parse_phone(data: dict) -> tuple[str | None, str | None]:
+    errcode = data.get("errcode", 0)
+    if errcode != 0:
+        return None, data.get("errmsg", "获取手机号失败")
+    phone_info = data.get("phone_info") or {}
+    # purePhoneNumber 为 11 位国内手机号
+    phone = phone_info.get("purePhoneNumber") or phone_info.get("phoneNumber", "").replace(" ", "")
+    return phone or None, None
+
+
+def _session_params(code: str) -> dict:
+    return {
+        "appid": settings.wechat_appid,
+        "secret": settings.wechat_secret,
+        "js_code": code,
+        "grant_type": "authorization_code",
+    }
+
+
+def _parse_session(data: dict) -> tuple[str | None, str | None]:
+    errcode = data.get("errcode", 0)
+    if errcode != 0:
+        return None, data.get("errmsg", "code 无效或已过期")
+    return data.get("openid"), None
+
+
+def _get_access_token() -> tuple[str | None, str | None]:
+    """获取 access_token（用于调用 getPhoneNumber 等接口）"""
+    err = _credentials_error()
+    if err:
+        return None, err
+    token = _cached_token()
+    if token:
+        return token, None
+    with _token_lock:
+        token = _cached_token()
+        if token:
+            return token, None
+        now = time.time()
+        try:
+            with _timed("token"):
+                data = _get_client().get(_url("/cgi-bin/token"), params=_token_params()).json()
+        except Exception as e:
+            return None, str(e)
+        return _checked("token", _store_token(data, now))
+
+
+async def get_access_token_async() -> tuple[str | None, str | None]:
+    """异步获取 access_token；缓存失效时并发调用只发起一次刷新"""
+    global _async_token_lock
+    err = _credentials_error()
+    if err:
+        return None, err
+    token = _cached_token()
+    if token:
+        return token, None
+    if _async_token_lock is None:
+        _async_token_lock = asyncio.Lock()
+    async with _async_token_lock:
+        token = _cached_token()
+        if token:
+            return token, None
+        now = time.time()
+        try:
+            with _timed("token"):
+                resp = await get_async_client().get(_url("/cgi-bin/token"), params=_token_params())
+                data = resp.json()
+        except Exception as e:
+            return None, str(e)
+        return _checked("token", _store_token(data, now))
+
+
 def getPhoneNumber(code: str) -> tuple[str | None, str | None]:
     """
     小程序端 getPhoneNumber 授权后，服务端用 code 换取手机号
@@ -49,20 +189,28 @@ def getPhoneNumber(code: str) -> tuple[str | None, str | None]:
     access_token, err = _get_access_token()
     if err or not access_token:
         return None, err or "获取 access_token 失败"
-    url = f"{WECHAT_GET_PHONE}?access_token={access_token}"
+    url = _url(f"/wxa/business/getuserphonenumber?access_token={access_token}")
+    try:
+        with _timed("getuserphonenumber"):
+            data = _get_client().post(url, json={"code": code}).json()
+    except Exception as e:
+        return None, str(e)
+    return _checked("getuserphonenumber", _parse_phone(data))
+
+
+async def get_phone_number_async(code: str) -> tuple[str | None, str | None]:
+    """getPhoneNumber 的异步版本"""
+    access_token, err = await get_access_token_async()
+    if err or not access_token:
+        return None, err or "获取 access_token 失败"
+    url = _url(f"/wxa/business/getuserphonenumber?access_token={access_token}")
     try:
-        with httpx.Client(timeout=10.0) as client:
-            resp = client.post(url, json={"code": code})
+        with _timed("getuserphonenumber"):
+            resp = await get_async_client().post(url, json={"code": code})
             data = resp.json()
     except Exception as e:
         return None, str(e)
-    errcode = data.get("errcode", 0)
-    if errcode != 0:
-        return None, data.get("errmsg", "获取手机号失败")
-    phone_info = data.get("phone_info") or {}
-    # purePhoneNumber 为 11 位国内手机号
-    phone = phone_info.get("purePhoneNumber") or phone_info.get("phoneNumber", "").replace(" ", "")
-    return phone or None, None
+    return _checked("getuserphonenumber", _parse_phone(data))
 
 
 def code2session(code: str) -> tuple[str | None, str | None]:
@@ -70,21 +218,26 @@ def code2session(code: str) -> tuple[str | None, str | None]:
     用 wx.login 获得的 code 换取 openid
     Returns: (openid, error_message)
     """
-    if not settings.wechat_appid or not settings.wechat_secret:
-        return None, "未配置 WECHAT_APPID 或 WECHAT_SECRET"
-    params = {
-        "appid": settings.wechat_appid,
-        "secret": settings.wechat_secret,
-        "js_code": code,
-        "grant_type": "authorization_code",
-    }
+    err = _credentials_error()
+    if err:
+        return None, err
     try:
-        with httpx.Client(timeout=10.0) as client:
-            resp = client.get(WECHAT_CODE2SESSION, params=params)
+        with _timed("jscode2session"):
+            data = _get_client().get(_url("/sns/jscode2session"), params=_session_params(code)).json()
+    except Exception as e:
+        return None, str(e)
+    return _checked("jscode2session", _parse_session(data))
+
+
+async def code2session_async(code: str) -> tuple[str | None, str | None]:
+    """code2session 的异步版本"""
+    err = _credentials_error()
+    if err:
+        return None, err
+    try:
+        with _timed("jscode2session"):
+            resp = await get_async_client().get(_url("/sns/jscode2session"), params=_session_params(code))
             data = resp.json()
     except Exception as e:
         return None, str(e)
-    errcode = data.get("errcode", 0)
-    if errcode != 0:
-        return None, data.get("errmsg", "code 无效或已过期")
-    return data.get("openid"), None
+    return _checked("jscode2session", _parse_session(data))
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+inventory_service 性能基准：按规模造数，逐项计时热点函数，与 JSON 基线比较，超出容差即失败。
+
+  python benchmarks/run.py                                # small 规模，临时 SQLite，对比 baselines/sqlite.json
+  python benchmarks/run.py --scales small,medium          # 多个规模
+  python benchmarks/run.py --scales small --update-baseline
+  python benchmarks/run.py --database-url mysql+pymysql://root:pw@localhost/store_bench
+
+规模（SCALES）可用 --lots/--history/--users/--item-types/--years 覆盖；覆盖后与基线中记录的
+规模参数不同，该规模不做比较。--database-url 须指向专用库：每个规模开始前会删除并重建全部表。
+每项先预热 --warmup 次，再计时 --repeat 次，记录最小值与中位数，默认按最小值（--stat）与基线比较：
+本次 > 基线 × (1 + --tolerance) 且差值超过 --min-delta-ms 判为退化（退出码 1）。
+出库两项会真实扣减库存（每次 1 个单位），同一规模、同一造数下每次运行的操作序列相同。
+基线与机器相关，请在固定的参考机器上用 --update-baseline 生成后提交。
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import sqlalchemy
+from sqlalchemy import BigInteger, create_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import InventoryRecord
+from app.services.inventory_service import (
+    get_io_details,
+    get_io_stats_by_range,
+    get_my_inbound,
+    get_my_outbound,
+    get_outbound_list,
+    get_overview,
+    outbound_by_id,
+    outbound_fifo,
+)
+from scripts.check_query_plans import seed
+
+
+@compiles(BigInteger, "sqlite")
+def _sqlite_bigint(type_, compiler, **kw):
+    # SQLite 只有 INTEGER PRIMARY KEY 才自增；出入库历史的 BigInteger 主键在临时库中按 INTEGER 建表，
+    # 否则出库写历史时 id 为空
+    return "INTEGER"
+
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+SCALES = {
+    "small": {"lots": 2000, "history": 10000, "users": 20, "item_types": 20, "years": 1},
+    "medium": {"lots": 20000, "history": 100000, "users": 50, "item_types": 40, "years": 3},
+    "large": {"lots": 100000, "history": 500000, "users": 200, "item_types": 80, "years": 5},
+}
+
+
+def build_context(db) -> dict:
+    """各项调用的参数：物品类型、可供按 id 出库的批次、分页游标、日期范围"""
+    today = date.today()
+    item_types = [
+        r[0]
+        for r in db.query(InventoryRecord.item_type).distinct().order_by(InventoryRecord.item_type)
+    ]
+    lot_ids = [
+        r[0]
+        for r in db.query(InventoryRecord.id)
+        .filter(InventoryRecord.quantity >= 50)
+        .order_by(InventoryRecord.id)
+        .limit(200)
+    ]
+    _, _, inbound_cursor = get_my_inbound(db, 1, limit=20)
+    _, _, outbound_cursor = get_my_outbound(db, 1, limit=20)
+    db.rollback()
+    return {
+        "today": today.isoformat(),
+        "start_30d": (today - timedelta(days=30)).isoformat(),
+        "start_1y": (today - timedelta(days=365)).isoformat(),
+        "item_types": item_types,
+        "item_type": item_types[0],
+        "lot_ids": lot_ids,
+        "inbound_cursor": inbound_cursor,
+        "outbound_cursor": outbound_cursor,
+        "calls": 0,
+    }
+
+
+def _next(ctx: dict, key: str):
+    """轮流取 ctx[key] 中的值，出库分散到不同物品/批次"""
+    ctx["calls"] += 1
+    values = ctx[key]
+    return values[ctx["calls"] % len(values)]
+
+
+def _outbound_fifo(db, ctx):
+    ok, message = outbound_fifo(db, 1, _next(ctx, "item_types"), 1, ctx["today"])
+    if not ok:
+        raise RuntimeError(f"outbound_fifo 失败: {message}")
+
+
+def _outbound_by_id(db, ctx):
+    ok, message = outbound_by_id(db, 1, _next(ctx, "lot_ids"), 1, ctx["today"])
+    if not ok:
+        raise RuntimeError(f"outbound_by_id 失败: {message}")
+
+
+# (名称, 调用)；名称即基线中的键，改名会使该项失去基线
+CASES = [
+    ("get_overview/all", lambda db, ctx: get_overview(db)),
+    ("get_overview/page20", lambda db, ctx: get_overview(db, limit=20)),
+    (
+        "get_overview/item_type",
+        lambda db, ctx: get_overview(db, item_type=ctx["item_type"], limit=50),
+    ),
+    ("get_overview/warning_only", lambda db, ctx: get_overview(db, warning_only=True, limit=20)),
+    ("get_outbound_list", lambda db, ctx: get_outbound_list(db)),
+    ("outbound_fifo", _outbound_fifo),
+    ("outbound_by_id", _outbound_by_id),
+    (
+        "get_io_stats_by_range/30d",
+        lambda db, ctx: get_io_stats_by_range(db, ctx["start_30d"], ctx["today"]),
+    ),
+    (
+        "get_io_stats_by_range/1y",
+        lambda db, ctx: get_io_stats_by_range(db, ctx["start_1y"], ctx["today"]),
+    ),
+    (
+        "get_io_details/30d_page20",
+        lambda db, ctx: get_io_details(
+            db, ctx["item_type"], ctx["start_30d"], ctx["today"], "both", limit=20
+        ),
+    ),
+    (
+        "get_io_details/1y_all_types_page20",
+        lambda db, ctx: get_io_details(db, None, ctx["start_1y"], ctx["today"], "both", limit=20),
+    ),
+    ("my_inbound/first_page", lambda db, ctx: get_my_inbound(db, 1, limit=20)),
+    (
+        "my_inbound/cursor_page",
+        lambda db, ctx: get_my_inbound(db, 1, limit=20, cursor=ctx["inbound_cursor"]),
+    ),
+    ("my_inbound/offset_page25", lambda db, ctx: get_my_inbound(db, 1, page=25, limit=20)),
+    ("my_outbound/first_page", lambda db, ctx: get_my_outbound(db, 1, limit=20)),
+    (
+        "my_outbound/cursor_page",
+        lambda db, ctx: get_my_outbound(db, 1, limit=20, cursor=ctx["outbound_cursor"]),
+    ),
+    ("my_outbound/offset_page25", lambda db, ctx: get_my_outbound(db, 1, page=25, limit=20)),
+]
+
+
+def time_case(Session, call, ctx: dict, warmup: int, repeat: int) -> dict:
+    """每次调用使用新会话（不复用标识映射），返回毫秒统计"""
+    samples = []
+    for i in range(warmup + repeat):
+        db = Session()
+        try:
+            start = time.perf_counter()
+            call(db, ctx)
+            elapsed = time.perf_counter() - start
+            db.rollback()
+        finally:
+            db.close()
+        if i >= warmup:
+            samples.append(elapsed * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "max_ms": round(max(samples), 3),
+        "repeat": repeat,
+    }
+
+
+def run_scale(
+    url: str | None, name: str, params: dict, warmup: int, repeat: int, only: list[str]
+) -> dict:
+    if url is None:
+        url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), f'bench_{name}.db')}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    db = Session()
+    print(f"[{name}] 造数中: {params}")
+    start = time.perf_counter()
+    seed(
+        db, params["lots"], params["history"], params["users"], params["item_types"], params["years"]
+    )
+    if engine.dialect.name == "sqlite":
+        db.execute(sqlalchemy.text("ANALYZE"))
+        db.commit()
+    ctx = build_context(db)
+    db.close()
+    print(f"[{name}] 造数完成，用时 {time.perf_counter() - start:.1f}s")
+    results = {}
+    for case, call in CASES:
+        if only and not any(case.startswith(prefix) for prefix in only):
+            continue
+        results[case] = time_case(Session, call, ctx, warmup, repeat)
+        print(f"[{name}] {case:<40}{results[case]['median_ms']:>10.2f} ms")
+    engine.dispose()
+    return results
+
+
+def compare(
+    scale: str, results: dict, baseline: dict, stat: str, tolerance: float, min_delta_ms: float
+) -> int:
+    """打印与基线的对比（按 stat：median_ms 或 min_ms），返回退化项数"""
+    regressions = 0
+    print(f"\n[{scale}] 与基线对比（{stat}，容差 {tolerance:.0%}，最小差值 {min_delta_ms}ms）")
+    print(f"{'项目':<40}{'基线ms':>10}{'本次ms':>10}{'比例':>8}  结果")
+    for case, current in results.items():
+        base = baseline.get(case)
+        if base is None:
+            print(f"{case:<40}{'-':>10}{current[stat]:>10.2f}{'-':>8}  无基线")
+            continue
+        ratio = current[stat] / base[stat] if base[stat] else float("inf")
+        delta = current[stat] - base[stat]
+        if ratio > 1 + tolerance and delta > min_delta_ms:
+            status = "退化"
+            regressions += 1
+        elif ratio < 1 - tolerance and -delta > min_delta_ms:
+            status = "提升"
+        else:
+            status = "持平"
+        print(f"{case:<40}{base[stat]:>10.2f}{current[stat]:>10.2f}{ratio:>8.2f}  {status}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="inventory_service 性能基准")
+    parser.add_argument("--database-url", help="专用库（每个规模会删除并重建全部表），默认临时 SQLite")
+    parser.add_argument("--scales", default="small", help=f"逗号分隔，可选 {','.join(SCALES)}")
+    parser.add_argument("--lots", type=int, help="覆盖规模的库存批次数")
+    parser.add_argument("--history", type=int, help="覆盖规模的出、入库历史条数")
+    parser.add_argument("--users", type=int, help="覆盖规模的用户数")
+    parser.add_argument("--item-types", type=int, help="覆盖规模的物品类型数")
+    parser.add_argument("--years", type=int, help="覆盖规模的历史跨度（年）")
+    parser.add_argument("--cases", default="", help="只运行名称以这些前缀开头的项目，逗号分隔")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument(
+        "--stat",
+        choices=("min", "median"),
+        default="min",
+        help="与基线比较的统计量；min 受机器上其他负载的干扰最小",
+    )
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的相对退化，默认 25%%")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="小于该差值的变化视为噪声")
+    parser.add_argument("--baseline", help="基线文件，默认 benchmarks/baselines/<方言>.json")
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果更新基线（不做比较）")
+    parser.add_argument("--output", help="另将本次结果写入该 JSON 文件")
+    args = parser.parse_args()
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"未知规模: {', '.join(unknown)}")
+    overrides = {
+        k: v
+        for k, v in {
+            "lots": args.lots,
+            "history": args.history,
+            "users": args.users,
+            "item_types": args.item_types,
+            "years": args.years,
+        }.items()
+        if v is not None
+    }
+    only = [c.strip() for c in args.cases.split(",") if c.strip()]
+    dialect = create_engine(args.database_url).dialect.name if args.database_url else "sqlite"
+    baseline_path = Path(args.baseline) if args.baseline else BASELINE_DIR / f"{dialect}.json"
+    baseline = json.loads(baseline_path.read_text("utf-8")) if baseline_path.exists() else {}
+
+    report = {
+        "meta": {
+            "dialect": dialect,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "machine": f"{platform.system()} {platform.machine()}",
+            "warmup": args.warmup,
+            "repeat": args.repeat,
+        },
+        "scales": {},
+    }
+    regressions = 0
+    for scale in scales:
+        params = {**SCALES[scale], **overrides}
+        results = run_scale(args.database_url, scale, params, args.warmup, args.repeat, only)
+        report["scales"][scale] = {"params": params, "results": results}
+        if args.update_baseline:
+            continue
+        base = baseline.get("scales", {}).get(scale)
+        if base is None:
+            print(f"\n[{scale}] 基线 {baseline_path} 中没有该规模，跳过比较（可用 --update-baseline 生成）")
+        elif base["params"] != params:
+            print(f"\n[{scale}] 规模参数与基线不同，跳过比较: 基线 {base['params']}")
+        else:
+            regressions += compare(
+                scale, results, base["results"], f"{args.stat}_ms", args.tolerance, args.min_delta_ms
+            )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", "utf-8")
+    if args.update_baseline:
+        merged = {"meta": report["meta"], "scales": {**baseline.get("scales", {}), **report["scales"]}}
+        if only:
+            # 只运行了部分项目：保留基线中其余项目
+            for scale, data in report["scales"].items():
+                old = baseline.get("scales", {}).get(scale, {})
+                if old.get("params") == data["params"]:
+                    merged["scales"][scale] = {
+                        "params": data["params"],
+                        "results": {**old.get("results", {}), **data["results"]},
+                    }
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(merged, ensure_ascii=False, indent=2) + "\n", "utf-8")
+        print(f"\n基线已写入 {baseline_path}")
+        return 0
+    print("\n无退化" if not regressions else f"\n{regressions} 项退化")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""Add stock_summary table
+
+Revision ID: 011
+Revises: 010
+Create Date: 2025-02-01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_summary",
+        sa.Column("item_type", sa.String(64), nullable=False),
+        sa.Column("unit", sa.String(32), nullable=False, server_default=""),
+        sa.Column("total_quantity", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("lot_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("earliest_expiry", sa.Date(), nullable=True),
+        sa.PrimaryKeyConstraint("item_type", "unit"),
+    )
+    # 用现有库存回填汇总
+    op.execute(
+        "INSERT INTO stock_summary (item_type, unit, total_quantity, lot_count, earliest_expiry) "
+        "SELECT item_type, COALESCE(unit, ''), SUM(quantity), COUNT(*), MIN(expiry_date) "
+        "FROM inventory_records GROUP BY item_type, COALESCE(unit, '')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stock_summary")
@@ -0,0 +1,35 @@
+"""Add (user_id, create_time, id) indexes for my-inbound/my-outbound cursor paging
+
+Revision ID: 012
+Revises: 011
+Create Date: 2025-02-01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_inbound_history_user_create_id",
+        "inbound_history",
+        ["user_id", "create_time", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_outbound_history_user_create_id",
+        "outbound_history",
+        ["user_id", "create_time", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbound_history_user_create_id", table_name="outbound_history")
+    op.drop_index("ix_inbound_history_user_create_id", table_name="inbound_history")
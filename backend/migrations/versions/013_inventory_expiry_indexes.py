@@ -0,0 +1,30 @@
+"""Add expiry_date indexes on inventory_records for overview ordering
+
+Revision ID: 013
+Revises: 012
+Create Date: 2025-02-01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_inventory_records_expiry_date", "inventory_records", ["expiry_date"], unique=False)
+    op.create_index(
+        "ix_inventory_records_item_type_expiry",
+        "inventory_records",
+        ["item_type", "expiry_date"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_inventory_records_item_type_expiry", table_name="inventory_records")
+    op.drop_index("ix_inventory_records_expiry_date", table_name="inventory_records")
@@ -0,0 +1,76 @@
+"""Composite and covering indexes for inventory_service hot queries
+
+Adds indexes for FIFO allocation, the outbound list ordering, io-stats
+aggregation and io-details lookups, and drops single-column indexes that
+are now left prefixes of a composite index.
+
+Revision ID: 014
+Revises: 013
+Create Date: 2025-02-01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "014"
+down_revision: Union[str, None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_inventory_records_item_type_fifo",
+        "inventory_records",
+        ["item_type", "inbound_date", "create_time"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_inventory_records_inbound_create",
+        "inventory_records",
+        ["inbound_date", "create_time"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_inbound_history_date_item_qty",
+        "inbound_history",
+        ["inbound_date", "item_type", "quantity"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_inbound_history_item_date",
+        "inbound_history",
+        ["item_type", "inbound_date"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_outbound_history_date_item_qty",
+        "outbound_history",
+        ["outbound_date", "item_type", "quantity"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_outbound_history_item_date",
+        "outbound_history",
+        ["item_type", "outbound_date"],
+        unique=False,
+    )
+    # 已被复合索引的最左前缀覆盖
+    op.drop_index("ix_inventory_records_item_type", table_name="inventory_records")
+    op.drop_index("ix_inbound_history_user_id", table_name="inbound_history")
+    op.drop_index("ix_outbound_history_user_id", table_name="outbound_history")
+    op.drop_index("ix_outbound_history_item_type", table_name="outbound_history")
+
+
+def downgrade() -> None:
+    op.create_index("ix_outbound_history_item_type", "outbound_history", ["item_type"], unique=False)
+    op.create_index("ix_outbound_history_user_id", "outbound_history", ["user_id"], unique=False)
+    op.create_index("ix_inbound_history_user_id", "inbound_history", ["user_id"], unique=False)
+    op.create_index("ix_inventory_records_item_type", "inventory_records", ["item_type"], unique=False)
+    op.drop_index("ix_outbound_history_item_date", table_name="outbound_history")
+    op.drop_index("ix_outbound_history_date_item_qty", table_name="outbound_history")
+    op.drop_index("ix_inbound_history_item_date", table_name="inbound_history")
+    op.drop_index("ix_inbound_history_date_item_qty", table_name="inbound_history")
+    op.drop_index("ix_inventory_records_inbound_create", table_name="inventory_records")
+    op.drop_index("ix_inventory_records_item_type_fifo", table_name="inventory_records")
@@ -0,0 +1,42 @@
+"""Add daily_io_rollup table
+
+Revision ID: 015
+Revises: 014
+Create Date: 2025-02-01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "015"
+down_revision: Union[str, None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_io_rollup",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("item_type", sa.String(64), nullable=False),
+        sa.Column("inbound_qty", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("outbound_qty", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("day", "item_type"),
+    )
+    # 用现有出入库历史回填
+    op.execute(
+        "INSERT INTO daily_io_rollup (day, item_type, inbound_qty, outbound_qty) "
+        "SELECT day, item_type, SUM(inbound_qty), SUM(outbound_qty) FROM ("
+        "SELECT inbound_date AS day, item_type, quantity AS inbound_qty, 0 AS outbound_qty "
+        "FROM inbound_history "
+        "UNION ALL "
+        "SELECT outbound_date AS day, item_type, 0 AS inbound_qty, quantity AS outbound_qty "
+        "FROM outbound_history"
+        ") t GROUP BY day, item_type"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_io_rollup")
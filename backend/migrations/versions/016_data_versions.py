@@ -0,0 +1,30 @@
+"""Add data_versions table for ETag generation
+
+Revision ID: 016
+Revises: 015
+Create Date: 2025-02-01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "016"
+down_revision: Union[str, None] = "015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "data_versions",
+        sa.Column("name", sa.String(32), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.execute("INSERT INTO data_versions (name, version) VALUES ('inventory', 0), ('config', 0)")
+
+
+def downgrade() -> None:
+    op.drop_table("data_versions")
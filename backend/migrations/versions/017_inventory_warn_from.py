@@ -0,0 +1,45 @@
+"""Add persisted warn_from date on inventory_records for expiry alerts
+
+Revision ID: 017
+Revises: 016
+Create Date: 2025-02-01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "017"
+down_revision: Union[str, None] = "016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("inventory_records", sa.Column("warn_from", sa.Date(), nullable=True))
+    # 未单独设置 expiry_warning_days 的批次使用全局 EXPIRY_WARNING_DAYS（缺省 7 天）
+    op.execute(
+        """
+        UPDATE inventory_records
+        SET warn_from = DATE_SUB(
+            expiry_date,
+            INTERVAL COALESCE(
+                expiry_warning_days,
+                (SELECT CAST(value AS SIGNED) FROM config WHERE `key` = 'EXPIRY_WARNING_DAYS'),
+                7
+            ) DAY
+        )
+        """
+    )
+    op.create_index(
+        "ix_inventory_records_warn_from",
+        "inventory_records",
+        ["warn_from", "expiry_date"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_inventory_records_warn_from", table_name="inventory_records")
+    op.drop_column("inventory_records", "warn_from")
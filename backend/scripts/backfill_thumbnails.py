@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+为 uploads/ 下已有图片补生成缩略图与 WebP 大图
+  python scripts/backfill_thumbnails.py              # 只处理缺少衍生图的原图
+  python scripts/backfill_thumbnails.py --force      # 全部重建
+  python scripts/backfill_thumbnails.py --workers 4
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.services.image_service import (
+    DERIVATIVES,
+    IMAGE_EXTENSIONS,
+    derivative_path,
+    is_derivative,
+    make_derivatives,
+)
+
+
+def find_originals(root: Path, force: bool) -> list[Path]:
+    originals = []
+    for path in root.rglob("*"):
+        if (
+            not path.is_file()
+            or path.name.startswith(".")
+            or path.suffix.lower() not in IMAGE_EXTENSIONS
+            or is_derivative(path)
+        ):
+            continue
+        if force or any(not derivative_path(path, name).exists() for name in DERIVATIVES):
+            originals.append(path)
+    return originals
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="补生成缩略图与 WebP 大图")
+    parser.add_argument("--force", action="store_true", help="已存在的衍生图也重新生成")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="进程数")
+    args = parser.parse_args()
+
+    originals = find_originals(Path(settings.upload_dir), args.force)
+    print(f"待处理原图 {len(originals)} 张")
+    created = failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(make_derivatives, str(p), args.force): p for p in originals}
+        for future in as_completed(futures):
+            try:
+                created += len(future.result())
+            except Exception as e:
+                failed += 1
+                print(f"失败: {futures[future]}: {e}")
+    print(f"生成衍生图 {created} 张，失败 {failed} 张")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+只读接口压测：同步会话（线程池）vs 异步引擎（ASYNC_DATABASE_URL），高并发下对比延迟分位数
+  python scripts/bench_async_reads.py --concurrency 200 --seconds 10
+  python scripts/bench_async_reads.py --database-url mysql+pymysql://root:pw@localhost/store_bench
+
+在造好的库上（与 check_query_plans.py 相同的造数，库为空时自动造数）分别以两种配置启动
+uvicorn 子进程（单 worker），用 httpx 并发请求 overview（分页、按物品筛选）与 io-stats，
+统计 req/s 与 p50/p95/p99。异步连接串默认由 --database-url 换驱动得到：
+mysql+pymysql -> mysql+asyncmy，sqlite -> sqlite+aiosqlite。
+SQLite 为单写多读的文件库，并发读的结果只反映应用层差异；评估连接池与慢查询排队请使用 MySQL。
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.auth import create_access_token
+from app.database import Base
+from app.models import InventoryRecord
+from scripts.check_query_plans import seed
+
+
+def to_async_url(url: str) -> str:
+    if url.startswith("mysql+pymysql://"):
+        return "mysql+asyncmy://" + url[len("mysql+pymysql://"):]
+    if url.startswith("sqlite:///"):
+        return "sqlite+aiosqlite:///" + url[len("sqlite:///"):]
+    raise SystemExit(f"无法推断异步连接串，请通过 --async-database-url 指定: {url}")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(database_url: str, async_url: str) -> tuple[subprocess.Popen, str]:
+    port = free_port()
+    env = {**os.environ, "DATABASE_URL": database_url, "ASYNC_DATABASE_URL": async_url}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base}/health").status_code == 200:
+                return proc, base
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit("uvicorn 启动超时")
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def run_load(base: str, token: str, paths: list[str], concurrency: int, seconds: float):
+    latencies: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60, headers=headers) as client:
+        deadline = time.perf_counter() + seconds
+
+        async def worker():
+            nonlocal errors
+            rng = random.Random()
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                resp = await client.get(rng.choice(paths))
+                latencies.append(time.perf_counter() - start)
+                if resp.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, latencies, errors
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="只读接口同步/异步压测")
+    parser.add_argument("--database-url", help="专用压测库，默认使用临时 SQLite 文件")
+    parser.add_argument("--async-database-url", help="默认由 --database-url 换驱动得到")
+    parser.add_argument("--lots", type=int, default=20000, help="库存批次数")
+    parser.add_argument("--history", type=int, default=50000, help="出、入库历史各多少条")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=10.0, help="每种配置持续时间")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_async.db')}"
+    async_url = args.async_database_url or to_async_url(url)
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    if db.query(InventoryRecord).first() is None:
+        print(f"造数中: {args.lots} 批次，出入库历史各 {args.history} 条 ...")
+        seed(db, args.lots, args.history, users=20, item_types=40, years=3)
+    item_type = db.query(InventoryRecord.item_type).first()[0]
+    db.close()
+    engine.dispose()
+
+    today = date.today()
+    paths = [
+        "/api/inventory/overview?limit=20",
+        f"/api/inventory/overview?itemType={item_type}&limit=50",
+        f"/api/inventory/io-stats?startDate={today - timedelta(days=30)}&endDate={today}",
+    ]
+    token = create_access_token(1)
+    print(f"并发 {args.concurrency}，每种配置 {args.seconds}s")
+    print(f"{'配置':<10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'错误':>8}")
+    for label, configured in (("同步", ""), ("异步", async_url)):
+        proc, base = start_server(url, configured)
+        try:
+            rps, latencies, errors = asyncio.run(
+                run_load(base, token, paths, args.concurrency, args.seconds)
+            )
+        finally:
+            proc.terminate()
+            proc.wait()
+        p50, p95, p99 = (percentile(latencies, p) * 1000 for p in (0.5, 0.95, 0.99))
+        print(f"{label:<10}{rps:>10.0f}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}{errors:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+列表接口序列化基准：对比「整行 ORM 对象 + jsonable_encoder + json」与
+「按列查询 Row + orjson」（当前实现）在大库存下的每行耗时与内存峰值。
+  python scripts/bench_list_endpoints.py --lots 50000
+
+在临时 SQLite 库中造数（与 check_query_plans.py 相同），每种方式取多次运行的最小耗时，
+内存峰值由 tracemalloc 统计（包含查询结果与编码后的响应体）。
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.responses import FastJSONResponse
+from app.database import Base
+from app.models import InboundHistory, InventoryRecord
+from app.services.inventory_service import (
+    _overview_item,
+    get_my_inbound,
+    get_outbound_list,
+    get_overview,
+)
+from scripts.check_query_plans import seed
+
+
+def legacy_overview(db):
+    records = db.query(InventoryRecord).order_by(
+        InventoryRecord.expiry_date.asc(), InventoryRecord.id.asc()
+    ).all()
+    today_ts = datetime.combine(date.today(), datetime.min.time())
+    return [_overview_item(r, today_ts) for r in records]
+
+
+def legacy_outbound_list(db):
+    records = db.query(InventoryRecord).order_by(
+        InventoryRecord.inbound_date.asc(), InventoryRecord.create_time.asc()
+    ).all()
+    return [
+        {
+            "id": r.id,
+            "itemType": r.item_type,
+            "tag": r.tag or "",
+            "quantity": r.quantity,
+            "unit": r.unit or "",
+            "location": r.location or "",
+        }
+        for r in records
+    ]
+
+
+def legacy_my_inbound(db, limit):
+    rows = (
+        db.query(InboundHistory)
+        .filter(InboundHistory.user_id == 1)
+        .order_by(InboundHistory.create_time.desc(), InboundHistory.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "id": r.id,
+            "itemType": r.item_type,
+            "quantity": r.quantity,
+            "unit": r.unit or "",
+            "inboundDate": r.inbound_date.isoformat() if r.inbound_date else "",
+            "expiryDate": r.expiry_date.isoformat() if r.expiry_date else "",
+            "location": r.location or "",
+            "tag": r.tag or "",
+            "createTime": r.create_time.isoformat() if r.create_time else "",
+        }
+        for r in rows
+    ]
+
+
+def legacy_render(items) -> bytes:
+    content = jsonable_encoder({"success": True, "data": {"items": items}})
+    return json.dumps(content, ensure_ascii=False).encode("utf-8")
+
+
+def fast_render(items) -> bytes:
+    return FastJSONResponse({"success": True, "data": {"items": items}}).body
+
+
+def measure(Session, build, render, repeat: int) -> tuple[float, int, int]:
+    """返回 (最小耗时秒, 内存峰值字节, 行数)"""
+    best = float("inf")
+    rows = 0
+    for _ in range(repeat):
+        db = Session()
+        start = time.perf_counter()
+        items = build(db)
+        render(items)
+        best = min(best, time.perf_counter() - start)
+        rows = len(items)
+        db.close()
+    db = Session()
+    tracemalloc.start()
+    render(build(db))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    db.close()
+    return best, peak, rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="列表接口序列化基准")
+    parser.add_argument("--lots", type=int, default=50000, help="库存批次数")
+    parser.add_argument("--history", type=int, default=50000, help="出、入库历史各多少条")
+    parser.add_argument("--page-size", type=int, default=1000, help="my-inbound 每页条数")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_list.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    db = Session()
+    print(f"造数中: {args.lots} 批次，出入库历史各 {args.history} 条 ...")
+    seed(db, args.lots, args.history, users=20, item_types=40, years=3)
+    db.close()
+
+    cases = [
+        ("overview", legacy_overview, lambda db: get_overview(db)[0]),
+        ("outbound-list", legacy_outbound_list, get_outbound_list),
+        (
+            f"my-inbound x{args.page_size}",
+            lambda db: legacy_my_inbound(db, args.page_size),
+            lambda db: get_my_inbound(db, 1, limit=args.page_size)[0],
+        ),
+    ]
+    print(f"{'接口':<18}{'方式':<8}{'行数':>8}{'总耗时ms':>12}{'每行µs':>10}{'峰值MB':>10}")
+    for name, legacy, current in cases:
+        for label, build, render in (
+            ("旧", legacy, legacy_render),
+            ("新", current, fast_render),
+        ):
+            seconds, peak, rows = measure(Session, build, render, args.repeat)
+            per_row = seconds / rows * 1e6 if rows else 0
+            print(
+                f"{name:<18}{label:<8}{rows:>8}{seconds * 1000:>12.1f}"
+                f"{per_row:>10.2f}{peak / 1024 / 1024:>10.2f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
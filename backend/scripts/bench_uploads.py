@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+/uploads 吞吐基准：原 StaticFiles 挂载 vs UploadFiles（app/core/static_files.py）
+  python scripts/bench_uploads.py --files 50 --size 300 --concurrency 32 --seconds 5
+
+在临时目录生成测试图片，分别以 uvicorn 启动两个只挂载 /uploads 的应用（本机回环），
+用 httpx 并发请求，统计三种场景的 req/s 与 MB/s：整文件 GET、带 If-None-Match 的重新验证、
+Range 分段请求。客户端与服务端同机，结果反映的是相对差异。
+注意 immutable 的主要收益是客户端在有效期内根本不发请求，这一点基准中无法体现。
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+
+from app.core.static_files import UploadFiles
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app) -> tuple[uvicorn.Server, int]:
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, port
+
+
+async def run_load(base: str, names: list[str], mode: str, concurrency: int, seconds: float):
+    etags: dict[str, str] = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=30) as client:
+        if mode == "revalidate":
+            for name in names:
+                etags[name] = (await client.get(f"/uploads/{name}")).headers["etag"]
+        count = 0
+        received = 0
+        deadline = time.perf_counter() + seconds
+
+        async def worker():
+            nonlocal count, received
+            rng = random.Random()
+            while time.perf_counter() < deadline:
+                name = rng.choice(names)
+                headers = {}
+                if mode == "revalidate":
+                    headers["If-None-Match"] = etags[name]
+                elif mode == "range":
+                    headers["Range"] = "bytes=0-65535"
+                resp = await client.get(f"/uploads/{name}", headers=headers)
+                count += 1
+                received += len(resp.content)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+    return count / elapsed, received / elapsed / 1024 / 1024
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="/uploads 吞吐基准")
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--size", type=int, default=300, help="单个文件大小（KB）")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0, help="每个场景持续时间")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    names = []
+    for i in range(args.files):
+        name = f"{os.urandom(16).hex()}.jpg"
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(b"\xff\xd8\xff" + os.urandom(args.size * 1024 - 3))
+        names.append(name)
+
+    servers = {
+        "StaticFiles": start_server(
+            Starlette(routes=[Mount("/uploads", StaticFiles(directory=directory))])
+        ),
+        "UploadFiles": start_server(
+            Starlette(routes=[Mount("/uploads", UploadFiles(directory=directory))])
+        ),
+    }
+    print(f"{args.files} 个文件 × {args.size}KB，并发 {args.concurrency}，每场景 {args.seconds}s")
+    print(f"{'场景':<12}{'实现':<14}{'req/s':>10}{'MB/s':>10}")
+    for mode in ("full", "revalidate", "range"):
+        for label, (_, port) in servers.items():
+            rps, mbps = asyncio.run(
+                run_load(f"http://127.0.0.1:{port}", names, mode, args.concurrency, args.seconds)
+            )
+            print(f"{mode:<12}{label:<14}{rps:>10.0f}{mbps:>10.1f}")
+    for server, _ in servers.values():
+        server.should_exit = True
+    shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
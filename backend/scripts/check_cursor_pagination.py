@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+游标分页检查：多条记录 create_time 相同时，按 nextCursor 翻页应不重不漏且能走到最后一页
+（我的入库、我的出库、出入库明细 UNION ALL 分页与只查入库的明细）
+  python scripts/check_cursor_pagination.py --rows 11 --limit 3
+
+使用 .env 中的 DATABASE_URL（SQLite 或 MySQL）。以临时用户、随机物品类型入库/出库，
+再用一条 UPDATE 把这些历史的 create_time 统一设为数据库当前时间（与 server_default 同一写法），
+制造同一秒内的并列；结束后清理。不通过时退出码为 1。
+"""
+import argparse
+import os
+import random
+import sys
+import uuid
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, update
+
+from app.database import SessionLocal
+from app.models.daily_io_rollup import DailyIoRollup
+from app.models.inbound_history import InboundHistory
+from app.models.inventory import InventoryRecord
+from app.models.outbound_history import OutboundHistory
+from app.models.stock_summary import StockSummary
+from app.models.user import User
+from app.services.inventory_service import (
+    add_inbound,
+    get_io_details,
+    get_my_inbound,
+    get_my_outbound,
+    outbound_fifo,
+)
+
+
+def walk(fetch, limit: int, expected: int) -> tuple[list, list[str]]:
+    """从第一页开始按 nextCursor 翻页，返回 (全部条目, 发现的问题)"""
+    seen: list = []
+    cursor = None
+    for _ in range(expected // limit + 2):
+        items, has_more, cursor = fetch(cursor)
+        if len(items) > limit:
+            return seen, [f"单页返回 {len(items)} 条，超过 limit"]
+        seen.extend(items)
+        if not has_more:
+            break
+        if cursor is None:
+            return seen, ["hasMore 为真但没有 nextCursor"]
+    else:
+        return seen, [f"翻页未终止（已取 {len(seen)} 条）"]
+    if len(seen) != expected:
+        return seen, [f"共 {expected} 条，翻页取到 {len(seen)} 条"]
+    return seen, []
+
+
+def check_history(items: list) -> list[str]:
+    ids = [item["id"] for item in items]
+    if len(ids) != len(set(ids)):
+        return [f"翻页出现重复记录: {ids}"]
+    if ids != sorted(ids, reverse=True):
+        return [f"同一时间的记录未按 id 倒序: {ids}"]
+    return []
+
+
+def check_io_details(items: list) -> list[str]:
+    """同一天、同一时间的出入库明细：先全部出库再全部入库，入库数量各不相同（1..rows）"""
+    types = [item["type"] for item in items]
+    if types != sorted(types, reverse=True):
+        return [f"明细未按类型分组排序: {types}"]
+    quantities = [item["quantity"] for item in items if item["type"] == "inbound"]
+    if len(quantities) != len(set(quantities)):
+        return [f"翻页出现重复的入库明细: {quantities}"]
+    return []
+
+
+def check_io_details_single(items: list) -> list[str]:
+    """只查入库的明细按创建时间倒序，create_time 相同时后入库（数量更大）的在前"""
+    quantities = [item["quantity"] for item in items]
+    if quantities != sorted(set(quantities), reverse=True):
+        return [f"入库明细未按创建时间倒序或有重复: {quantities}"]
+    return []
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="游标分页并列 create_time 检查")
+    parser.add_argument("--rows", type=int, default=11, help="出、入库各多少条")
+    parser.add_argument("--limit", type=int, default=3, help="每页条数")
+    args = parser.parse_args()
+
+    item_type = f"__cursor__{uuid.uuid4().hex[:8]}"
+    today = date.today().isoformat()
+    db = SessionLocal()
+    # 出入库明细按操作人关联 users，需要真实存在的用户
+    user = User(name=item_type, phone=f"199{random.randint(0, 10**8 - 1):08d}", status="正常")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    failures = []
+    try:
+        for i in range(args.rows):
+            add_inbound(db, user_id, item_type, i + 1, today, today)
+        for _ in range(args.rows):
+            success, message = outbound_fifo(db, user_id, item_type, 1, today)
+            if not success:
+                failures.append(f"出库失败: {message}")
+        for model in (InboundHistory, OutboundHistory):
+            db.execute(
+                update(model).where(model.item_type == item_type).values(create_time=func.now())
+            )
+        db.commit()
+
+        checks = {
+            "my-inbound": (
+                lambda c: get_my_inbound(db, user_id, 1, args.limit, c),
+                args.rows,
+                check_history,
+            ),
+            "my-outbound": (
+                lambda c: get_my_outbound(db, user_id, 1, args.limit, c),
+                args.rows,
+                check_history,
+            ),
+            "io-details": (
+                lambda c: get_io_details(db, item_type, today, today, "both", 1, args.limit, c)[:3],
+                args.rows * 2,
+                check_io_details,
+            ),
+            "io-details inbound": (
+                lambda c: get_io_details(
+                    db, item_type, today, today, "inbound", 1, args.limit, c
+                )[:3],
+                args.rows,
+                check_io_details_single,
+            ),
+        }
+        for name, (fetch, expected, check) in checks.items():
+            items, problems = walk(fetch, args.limit, expected)
+            problems = problems or check(items)
+            print(f"{name}: {'通过' if not problems else '未通过'}")
+            failures.extend(f"{name} {p}" for p in problems)
+    finally:
+        # 清理测试数据
+        db.rollback()
+        db.query(InventoryRecord).filter(InventoryRecord.item_type == item_type).delete()
+        db.query(InboundHistory).filter(InboundHistory.item_type == item_type).delete()
+        db.query(OutboundHistory).filter(OutboundHistory.item_type == item_type).delete()
+        db.query(StockSummary).filter(StockSummary.item_type == item_type).delete()
+        db.query(DailyIoRollup).filter(DailyIoRollup.item_type == item_type).delete()
+        db.query(User).filter(User.id == user_id).delete()
+        db.commit()
+        db.close()
+
+    for f in failures:
+        print(f"失败: {f}")
+    print("通过" if not failures else "未通过")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+热点查询执行计划检查：在造好的大数据量库上调用 inventory_service 的热点函数，
+截获其实际执行的 SELECT 并 EXPLAIN，出现全表扫描即失败（退出码 1）。
+
+  python scripts/check_query_plans.py                       # 临时 SQLite 库
+  python scripts/check_query_plans.py --database-url mysql+pymysql://root:pw@localhost/store_plan
+
+--database-url 请指向专用的空库（先 alembic upgrade head，或由本脚本 create_all 建表），
+库为空时自动造数。按索引顺序扫描（SCAN ... USING INDEX / type=index）视为通过，
+扫描子查询的结果（SQLite CO-ROUTINE / MATERIALIZE，MySQL <derivedN> / <unionM,N>）不算全表扫描；
+需要临时排序（USE TEMP B-TREE / Using filesort）仅提示不判失败。
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import uuid
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import InboundHistory, InventoryRecord, OutboundHistory, User
+from app.services.inventory_service import (
+    _iter_fifo_lots,
+    get_io_details,
+    get_io_stats_by_range,
+    get_my_inbound,
+    get_expiring,
+    get_expiry_buckets,
+    get_my_outbound,
+    get_outbound_list,
+    get_overview,
+)
+from app.services.io_rollup_service import rebuild_io_rollup
+from app.services.stock_summary_service import get_stock_total, rebuild_stock_summary
+
+CHUNK = 5000
+
+
+def seed(db, lots: int, history: int, users: int, item_types: int, years: int) -> None:
+    """造数：users、inventory_records、inbound_history、outbound_history，再重建 stock_summary、daily_io_rollup"""
+    rng = random.Random(42)
+    types = [f"物品{i:03d}" for i in range(item_types)]
+    units = ["袋", "瓶", "箱", "斤", "个"]
+    today = date.today()
+    start = today - timedelta(days=365 * years)
+    span = (today - start).days
+
+    db.execute(
+        insert(User),
+        [
+            {"id": i, "name": f"用户{i}", "phone": f"139{i:08d}", "status": "已注册"}
+            for i in range(1, users + 1)
+        ],
+    )
+
+    def lot_row():
+        inbound = start + timedelta(days=rng.randrange(span))
+        expiry = inbound + timedelta(days=rng.randint(30, 720))
+        warning_days = rng.choice([None, 7, 30])
+        return {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "item_type": rng.choice(types),
+            "unit": rng.choice(units),
+            "quantity": rng.randint(1, 100),
+            "expiry_date": expiry,
+            "inbound_date": inbound,
+            "production_date": "",
+            "tag": "",
+            "location": f"A{rng.randint(1, 20)}",
+            "photo": "",
+            "expiry_warning_days": warning_days,
+            "warn_from": expiry - timedelta(days=7 if warning_days is None else warning_days),
+            "create_time": datetime.combine(inbound, datetime.min.time())
+            + timedelta(seconds=rng.randrange(86400)),
+        }
+
+    for offset in range(0, lots, CHUNK):
+        db.execute(insert(InventoryRecord), [lot_row() for _ in range(min(CHUNK, lots - offset))])
+
+    for offset in range(0, history, CHUNK):
+        n = min(CHUNK, history - offset)
+        inbound_rows = []
+        outbound_rows = []
+        for i in range(n):
+            day = start + timedelta(days=rng.randrange(span))
+            created = datetime.combine(day, datetime.min.time()) + timedelta(seconds=rng.randrange(86400))
+            common = {
+                "id": offset + i + 1,
+                "user_id": rng.randint(1, users),
+                "item_type": rng.choice(types),
+                "unit": rng.choice(units),
+                "quantity": rng.randint(1, 50),
+                "tag": "",
+                "location": "",
+                "create_time": created,
+            }
+            inbound_rows.append({
+                **common,
+                "inventory_record_id": str(uuid.uuid4()),
+                "expiry_date": day + timedelta(days=365),
+                "inbound_date": day,
+                "production_date": "",
+                "photo": "",
+            })
+            outbound_rows.append({**common, "outbound_date": day})
+        db.execute(insert(InboundHistory), inbound_rows)
+        db.execute(insert(OutboundHistory), outbound_rows)
+    db.commit()
+    rebuild_stock_summary(db)
+    rebuild_io_rollup(db)
+
+
+def explain(conn, dialect: str, statement: str, params) -> tuple[list[str], list[str]]:
+    """返回 (全表扫描, 提示)"""
+    full_scans: list[str] = []
+    notes: list[str] = []
+    if dialect == "sqlite":
+        subqueries: set[str] = set()
+        for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, params):
+            detail = row[-1]
+            if detail.startswith(("CO-ROUTINE ", "MATERIALIZE ")):
+                subqueries.add(detail.split(" ", 1)[1])
+            elif detail.startswith("SCAN ") and " USING " not in detail:
+                if detail.split(" ", 1)[1] not in subqueries:
+                    full_scans.append(detail)
+            elif "TEMP B-TREE" in detail:
+                notes.append(detail)
+    else:
+        for row in conn.exec_driver_sql("EXPLAIN " + statement, params).mappings():
+            if row.get("type") == "ALL" and not str(row.get("table") or "").startswith("<"):
+                full_scans.append(f"{row.get('table')}: type=ALL rows={row.get('rows')}")
+            extra = row.get("Extra") or ""
+            if "filesort" in extra or "temporary" in extra:
+                notes.append(f"{row.get('table')}: {extra}")
+    return full_scans, notes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="检查热点查询是否走索引")
+    parser.add_argument("--database-url", help="专用检查库，默认使用临时 SQLite 文件")
+    parser.add_argument("--lots", type=int, default=20000, help="库存批次数")
+    parser.add_argument("--history", type=int, default=100000, help="出、入库历史各多少条")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--item-types", type=int, default=40)
+    parser.add_argument("--years", type=int, default=3, help="历史跨度（年）")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'plan_check.db')}"
+    engine = create_engine(url)
+    dialect = engine.dialect.name
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    db = Session()
+    if db.query(InventoryRecord).first() is None:
+        print(f"造数中: {args.lots} 批次，出入库历史各 {args.history} 条 ...")
+        seed(db, args.lots, args.history, args.users, args.item_types, args.years)
+    with engine.begin() as conn:
+        if dialect == "sqlite":
+            conn.exec_driver_sql("ANALYZE")
+        else:
+            conn.exec_driver_sql("ANALYZE TABLE inventory_records, inbound_history, outbound_history, stock_summary, daily_io_rollup")
+
+    item_type = db.query(InventoryRecord.item_type).first()[0]
+    today = date.today()
+    start, end = (today - timedelta(days=30)).isoformat(), today.isoformat()
+    _, _, inbound_cursor = get_my_inbound(db, 1, limit=20, cursor=None)
+    _, _, io_cursor, _ = get_io_details(db, item_type, start, end, "both", limit=20)
+    _, _, outbound_cursor = get_my_outbound(db, 1, limit=20, cursor=None)
+    get_expiry_buckets(db)  # 预先载入配置缓存（config 表很小，整表读取属预期）
+
+    # (名称, 调用, 是否允许全表扫描：按设计返回全部数据的接口)
+    checks = [
+        ("overview 按到期分页", lambda: get_overview(db, limit=20), False),
+        ("overview 按物品类型", lambda: get_overview(db, item_type=item_type, limit=20), False),
+        ("overview 7 天内到期", lambda: get_overview(db, expiring_within_days=7, limit=20), False),
+        ("overview 仅告警", lambda: get_overview(db, warning_only=True, limit=20), False),
+        ("expiring 已进入告警", lambda: get_expiring(db, limit=20), False),
+        ("expiring 当天新进入告警", lambda: get_expiring(db, new_only=True, limit=20), False),
+        ("expiring 到期分桶", lambda: get_expiry_buckets(db), False),
+        ("outbound-list 全部批次", lambda: get_outbound_list(db), True),
+        ("FIFO 读取批次", lambda: next(_iter_fifo_lots(db, item_type), None), False),
+        ("库存总量", lambda: get_stock_total(db, item_type), False),
+        ("io-stats 30 天", lambda: get_io_stats_by_range(db, start, end), False),
+        ("io-details 30 天", lambda: get_io_details(db, item_type, start, end, "both"), False),
+        (
+            "io-details 游标翻页",
+            lambda: get_io_details(db, item_type, start, end, "both", limit=20, cursor=io_cursor),
+            False,
+        ),
+        ("my-inbound 游标翻页", lambda: get_my_inbound(db, 1, limit=20, cursor=inbound_cursor), False),
+        ("my-outbound 游标翻页", lambda: get_my_outbound(db, 1, limit=20, cursor=outbound_cursor), False),
+    ]
+
+    failed = 0
+    for name, call, allow_full_scan in checks:
+        captured: list = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                captured.append((statement, parameters))
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            call()
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+        db.rollback()
+        full_scans: list[str] = []
+        notes: list[str] = []
+        with engine.connect() as conn:
+            for statement, params in captured:
+                scans, hints = explain(conn, dialect, statement, params)
+                full_scans += scans
+                notes += hints
+        ok = allow_full_scan or not full_scans
+        failed += 0 if ok else 1
+        status = "OK  " if ok else "FAIL"
+        print(f"[{status}] {name}（{len(captured)} 条查询）")
+        for s in full_scans:
+            print(f"       全表扫描{'（允许）' if allow_full_scan else ''}: {s}")
+        for n in notes:
+            print(f"       提示: {n}")
+    db.close()
+    print("全部通过" if not failed else f"{failed} 项存在全表扫描")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
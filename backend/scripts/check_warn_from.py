@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+到期告警检查：修改 EXPIRY_WARNING_DAYS 后 /expiring 的结果应随之变化
+  python scripts/check_warn_from.py
+
+使用 .env 中的 DATABASE_URL（SQLite 或 MySQL）。以随机物品类型入库两个批次（到期日为 10 天后，
+一个沿用全局告警天数、一个单独设置 1 天），依次：
+  1. 经 set_config_value 把全局告警天数改为 12 天、3 天，检查 get_expiring 的结果；
+  2. 直接 UPDATE config 表改为 12 天（绕过接口），检查 verify_warn_from 报出不一致，
+     rebuild_warn_from 之后 get_expiring 恢复正确。
+结束后恢复原配置并清理。不通过时退出码为 1。
+"""
+import os
+import sys
+import uuid
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import update
+
+from app.database import SessionLocal
+from app.models.config import Config
+from app.models.daily_io_rollup import DailyIoRollup
+from app.models.inbound_history import InboundHistory
+from app.models.inventory import InventoryRecord
+from app.models.stock_summary import StockSummary
+from app.services.config_service import invalidate_config_cache, set_config_value
+from app.services.inventory_service import (
+    add_inbound,
+    get_expiring,
+    rebuild_warn_from,
+    verify_warn_from,
+)
+from app.services.version_service import CONFIG_VERSION, bump_version, commit_and_bump
+
+KEY = "EXPIRY_WARNING_DAYS"
+
+
+def expiring_quantities(db, item_type: str) -> list[int]:
+    """今天已进入告警的该物品批次数量（入库数量用于区分批次）"""
+    items, _, _ = get_expiring(db, item_type=item_type)
+    return sorted(item["quantity"] for item in items)
+
+
+def main() -> int:
+    item_type = f"__warn__{uuid.uuid4().hex[:8]}"
+    today = date.today()
+    expiry = (today + timedelta(days=10)).isoformat()
+    db = SessionLocal()
+    row = db.query(Config).filter(Config.key == KEY).first()
+    original = row.value if row is not None else None
+    failures = []
+
+    def check(name: str, expected: list[int]) -> None:
+        actual = expiring_quantities(db, item_type)
+        print(f"{name}: {'通过' if actual == expected else '未通过'}")
+        if actual != expected:
+            failures.append(f"{name} 期望告警批次 {expected}，实际 {actual}")
+
+    try:
+        # 数量 1：沿用全局告警天数；数量 2：单独设置 1 天，始终不告警
+        add_inbound(db, 0, item_type, 1, expiry, today.isoformat())
+        add_inbound(db, 0, item_type, 2, expiry, today.isoformat(), expiry_warning_days=1)
+
+        set_config_value(db, KEY, 12)
+        check("接口改为 12 天", [1])
+        set_config_value(db, KEY, 3)
+        check("接口改为 3 天", [])
+
+        db.execute(update(Config).where(Config.key == KEY).values(value="12"))
+        db.commit()
+        mismatches = [m for m in verify_warn_from(db) if m["itemType"] == item_type]
+        if len(mismatches) != 1:
+            failures.append(f"直接改表后应有 1 处不一致，校验报出 {len(mismatches)} 处")
+        rebuild_warn_from(db)
+        check("直接改表为 12 天并重算", [1])
+    finally:
+        db.rollback()
+        db.query(InventoryRecord).filter(InventoryRecord.item_type == item_type).delete()
+        db.query(InboundHistory).filter(InboundHistory.item_type == item_type).delete()
+        db.query(StockSummary).filter(StockSummary.item_type == item_type).delete()
+        db.query(DailyIoRollup).filter(DailyIoRollup.item_type == item_type).delete()
+        # 恢复原配置（原先没有该行则删除），递增版本号让其他进程的配置缓存失效
+        if original is None:
+            db.query(Config).filter(Config.key == KEY).delete()
+        else:
+            db.execute(update(Config).where(Config.key == KEY).values(value=original))
+        bump_version(db, CONFIG_VERSION)
+        commit_and_bump(db)
+        invalidate_config_cache()
+        rebuild_warn_from(db)
+        db.close()
+
+    for f in failures:
+        print(f"失败: {f}")
+    print("通过" if not failures else "未通过")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+重建或校验 daily_io_rollup 每日出入库汇总表
+  python scripts/rebuild_io_rollup.py           # 按出入库历史全量重建
+  python scripts/rebuild_io_rollup.py --verify  # 仅校验，不一致时退出码为 1
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.services.io_rollup_service import rebuild_io_rollup, verify_io_rollup
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="重建或校验 daily_io_rollup")
+    parser.add_argument("--verify", action="store_true", help="仅校验汇总表与出入库历史是否一致")
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        if args.verify:
+            mismatches = verify_io_rollup(db)
+            for m in mismatches:
+                print(f"不一致: {m['day']} {m['itemType']} 期望 {m['expected']} 实际 {m['actual']}")
+            print("校验通过" if not mismatches else f"共 {len(mismatches)} 处不一致")
+            return 1 if mismatches else 0
+        count = rebuild_io_rollup(db)
+        print(f"已重建 daily_io_rollup，共 {count} 行")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+重建或校验 stock_summary 库存汇总表
+  python scripts/rebuild_stock_summary.py           # 按 inventory_records 全量重建
+  python scripts/rebuild_stock_summary.py --verify  # 仅校验，不一致时退出码为 1
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.services.stock_summary_service import rebuild_stock_summary, verify_stock_summary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="重建或校验 stock_summary")
+    parser.add_argument("--verify", action="store_true", help="仅校验汇总表与库存记录是否一致")
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        if args.verify:
+            mismatches = verify_stock_summary(db)
+            for m in mismatches:
+                print(f"不一致: {m['itemType']} [{m['unit']}] 期望 {m['expected']} 实际 {m['actual']}")
+            print("校验通过" if not mismatches else f"共 {len(mismatches)} 处不一致")
+            return 1 if mismatches else 0
+        count = rebuild_stock_summary(db)
+        print(f"已重建 stock_summary，共 {count} 行")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
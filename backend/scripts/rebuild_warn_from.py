@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+重算或校验库存批次的 warn_from（进入到期告警的日期，/expiring 据此筛选）
+  python scripts/rebuild_warn_from.py           # 按当前 EXPIRY_WARNING_DAYS 与批次告警天数全量重算
+  python scripts/rebuild_warn_from.py --verify  # 仅校验，不一致时退出码为 1
+
+EXPIRY_WARNING_DAYS 经接口修改时会自动重算；直接改 config 表或脚本修改后需运行本脚本。
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.services.inventory_service import rebuild_warn_from, verify_warn_from
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="重算或校验 inventory_records.warn_from")
+    parser.add_argument("--verify", action="store_true", help="仅校验 warn_from 与当前配置是否一致")
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        if args.verify:
+            mismatches = verify_warn_from(db)
+            for m in mismatches:
+                print(f"不一致: 批次 {m['id']} {m['itemType']} 期望 {m['expected']} 实际 {m['actual']}")
+            print("校验通过" if not mismatches else f"共 {len(mismatches)} 处不一致")
+            return 1 if mismatches else 0
+        count = rebuild_warn_from(db)
+        print(f"已重算 warn_from，共 {count} 行")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
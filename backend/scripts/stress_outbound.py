@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+并发出库压力测试：多个线程同时对同一批次出库，校验不会超扣
+  python scripts/stress_outbound.py --threads 16 --initial 500 --quantity 3
+  python scripts/stress_outbound.py --mode mixed   # 一半线程按 id、一半按 FIFO 出库同一批次
+  python scripts/stress_outbound.py --mode batch   # 多行出库同时扣减两个批次，一半线程行序相反
+
+使用 .env 中的 DATABASE_URL（SQLite 或 MySQL）。测试数据使用随机物品类型，结束后清理。
+校验项：成功出库总量 = 初始数量 - 剩余数量、剩余数量不为负、出库历史条数 = 成功次数、stock_summary 与库存一致
+（batch 模式下每个批次分别校验，每次成功写两条出库历史）。
+不通过时退出码为 1。
+"""
+import argparse
+import os
+import sys
+import threading
+import uuid
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.models.inbound_history import InboundHistory
+from app.models.inventory import InventoryRecord
+from app.models.outbound_history import OutboundHistory
+from app.models.stock_summary import StockSummary
+from app.services.inventory_service import (
+    add_inbound,
+    outbound_batch,
+    outbound_by_id,
+    outbound_fifo,
+)
+from app.services.stock_summary_service import verify_stock_summary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="并发出库压力测试")
+    parser.add_argument("--threads", type=int, default=16, help="并发线程数")
+    parser.add_argument("--initial", type=int, default=500, help="批次初始数量")
+    parser.add_argument("--quantity", type=int, default=3, help="每次出库数量")
+    parser.add_argument("--user-id", type=int, default=1, help="写入出库历史的 user_id")
+    parser.add_argument(
+        "--mode",
+        choices=("id", "mixed", "batch"),
+        default="id",
+        help="id：全部按 id 出库；mixed：奇数号线程改为 FIFO 出库（同一物品只有这一个批次）；"
+        "batch：每次以两行的多行出库扣减两个物品的批次，奇数号线程两行顺序相反",
+    )
+    args = parser.parse_args()
+
+    item_type = f"__stress__{uuid.uuid4().hex[:8]}"
+    # batch 模式另建一个物品的批次，与 item_type 的批次在同一次多行出库中扣减
+    item_types = [item_type, f"{item_type}b"] if args.mode == "batch" else [item_type]
+    today = date.today().isoformat()
+    db = SessionLocal()
+    try:
+        record_ids = [
+            add_inbound(db, args.user_id, t, args.initial, today, today) for t in item_types
+        ]
+    finally:
+        db.close()
+    record_id = record_ids[0]
+
+    lock = threading.Lock()
+    counts = {"ok": 0, "short": 0, "busy": 0, "error": 0}
+    start = threading.Barrier(args.threads)
+
+    def by_id(session):
+        return outbound_by_id(session, args.user_id, record_id, args.quantity, today)
+
+    def fifo(session):
+        return outbound_fifo(session, args.user_id, item_type, args.quantity, today)
+
+    def batch(order):
+        lines = [
+            {
+                "id": record_ids[i],
+                "item_type": item_types[i],
+                "quantity": args.quantity,
+                "outbound_date": today,
+            }
+            for i in order
+        ]
+
+        def outbound(session):
+            success, errors = outbound_batch(session, args.user_id, lines)
+            return success, "；".join(e["message"] for e in errors)
+
+        return outbound
+
+    def worker(outbound):
+        session = SessionLocal()
+        try:
+            start.wait()
+            while True:
+                try:
+                    success, message = outbound(session)
+                except Exception:
+                    session.rollback()
+                    with lock:
+                        counts["error"] += 1
+                    return
+                with lock:
+                    if success:
+                        counts["ok"] += 1
+                    elif "繁忙" in message or "稍后重试" in message:
+                        counts["busy"] += 1
+                    else:
+                        counts["short"] += 1
+                        return
+        finally:
+            session.close()
+
+    def pick(i: int):
+        if args.mode == "batch":
+            return batch((1, 0) if i % 2 else (0, 1))
+        return fifo if args.mode == "mixed" and i % 2 else by_id
+
+    threads = [threading.Thread(target=worker, args=(pick(i),)) for i in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    db = SessionLocal()
+    try:
+        issued = counts["ok"] * args.quantity
+        print(f"结果: {counts}")
+        failures = []
+        for t, rid in zip(item_types, record_ids):
+            remaining = (
+                db.query(InventoryRecord.quantity).filter(InventoryRecord.id == rid).scalar()
+            ) or 0
+            history_count = (
+                db.query(OutboundHistory).filter(OutboundHistory.item_type == t).count()
+            )
+            print(
+                f"{t}: 初始 {args.initial}，出库 {issued}，剩余 {remaining}，"
+                f"出库历史 {history_count} 条"
+            )
+            if remaining < 0:
+                failures.append(f"{t} 剩余数量为负")
+            if issued + remaining != args.initial:
+                failures.append(f"{t} 出库总量与剩余数量不符（超扣或丢失扣减）")
+            if history_count != counts["ok"]:
+                failures.append(f"{t} 出库历史条数与成功次数不符")
+            if remaining >= args.quantity:
+                failures.append(f"{t} 库存仍充足但出库被拒绝")
+        if counts["error"]:
+            failures.append("出库抛出异常")
+        mismatches = [m for m in verify_stock_summary(db) if m["itemType"] in item_types]
+        if mismatches:
+            failures.append(f"stock_summary 不一致: {mismatches}")
+
+        # 清理测试数据
+        db.query(InventoryRecord).filter(InventoryRecord.item_type.in_(item_types)).delete()
+        db.query(InboundHistory).filter(InboundHistory.item_type.in_(item_types)).delete()
+        db.query(OutboundHistory).filter(OutboundHistory.item_type.in_(item_types)).delete()
+        db.query(StockSummary).filter(StockSummary.item_type.in_(item_types)).delete()
+        db.commit()
+    finally:
+        db.close()
+
+    for f in failures:
+        print(f"失败: {f}")
+    print("通过" if not failures else "未通过")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())